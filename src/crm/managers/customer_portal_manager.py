@@ -14,11 +14,133 @@ FEATURES:
 - Loyalty program integration
 """
 
+import os
 import json
+import base64
+import functools
+import logging
 import secrets
-from typing import Optional, List, Dict, Any
+import sqlite3
+from typing import Optional, List, Dict, Any, Iterator, Tuple
 from datetime import datetime, date, timedelta
 
+from ..models.database import Database
+
+try:
+    import orjson
+except ImportError:  # optional - faster JSON encoding when installed
+    orjson = None
+
+
+logger = logging.getLogger(__name__)
+
+
+def _json_dumps(value: Any) -> str:
+    """Encode value as a JSON string, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(value).decode()
+    return json.dumps(value)
+
+
+# Public URL prefixes; the per-customer token or id is appended
+_PORTAL_BASE_URL = "https://portal.yourshop.com/"
+_PAY_BASE_URL = "https://pay.yourshop.com/"
+_REFER_BASE_URL = "https://portal.pdrcrm.com/refer/"
+
+
+# Benefits listed for each loyalty tier
+_TIER_BENEFITS = {
+    'BRONZE': [
+        '1 point per $1 spent',
+        'Birthday discount'
+    ],
+    'SILVER': [
+        '1.5 points per $1 spent',
+        'Birthday discount',
+        '5% off all services'
+    ],
+    'GOLD': [
+        '2 points per $1 spent',
+        'Birthday discount',
+        '10% off all services',
+        'Priority scheduling'
+    ],
+    'PLATINUM': [
+        '2.5 points per $1 spent',
+        'Birthday discount',
+        '15% off all services',
+        'Priority scheduling',
+        'Free annual detail'
+    ]
+}
+
+
+# Hot-path write statements
+_SQL_INSERT_APPOINTMENT = """
+    INSERT INTO portal_appointments (
+        customer_id, service_date, service_time,
+        service_type, vehicle_info, damage_description,
+        contact_preference, notes,
+        created_at, status
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_INSERT_ESTIMATE_REQUEST = """
+    INSERT INTO portal_estimate_requests (
+        customer_id, vehicle_info, damage_description,
+        photo_urls, preferred_contact, urgency,
+        created_at, status
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_INSERT_REVIEW = """
+    INSERT INTO customer_reviews (
+        customer_id, job_id, rating, review_text,
+        would_recommend, review_categories,
+        created_at, status
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_INSERT_MESSAGE = """
+    INSERT INTO portal_messages (
+        customer_id, subject, message,
+        related_job_id, sender_type,
+        created_at, status
+    ) VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_INSERT_LOYALTY_TRANSACTION = """
+    INSERT INTO loyalty_transactions (
+        customer_id, transaction_type, points_earned,
+        description, related_invoice_id, created_at
+    ) VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_INSERT_REFERRAL_CLICK = """
+    INSERT INTO referral_link_clicks (
+        referrer_customer_id, click_source, clicked_at,
+        ip_address, user_agent
+    ) VALUES (?, ?, ?, ?, ?)
+"""
+
+_SQL_INSERT_ESTIMATE_PHOTO = """
+    INSERT INTO portal_estimate_photos (
+        request_id, photo_url, photo_type,
+        description, uploaded_at
+    ) VALUES (?, ?, ?, ?, ?)
+"""
+
+
+# Appointment listing columns; vehicle_info is flattened by SQLite, not json.loads
+_APPOINTMENT_COLUMNS = """
+    id, service_date, service_time, service_type,
+    json_extract(vehicle_info, '$.year') AS vehicle_year,
+    json_extract(vehicle_info, '$.make') AS vehicle_make,
+    json_extract(vehicle_info, '$.model') AS vehicle_model,
+    damage_description, contact_preference,
+    notes, cancellation_reason, status
+"""
+
 
 class CustomerPortalManager:
     """
@@ -35,17 +157,137 @@ class CustomerPortalManager:
         'PLATINUM': {'min_points': 5000, 'points_per_dollar': 2.5}
     }
 
+    # Job progress percentage by status
+    JOB_PROGRESS = {
+        'PENDING': 0,
+        'SCHEDULED': 10,
+        'CHECKED_IN': 20,
+        'IN_PROGRESS': 50,
+        'QUALITY_CHECK': 80,
+        'READY_FOR_PICKUP': 95,
+        'COMPLETED': 100,
+        'DELIVERED': 100
+    }
+
+    # Customer-facing details for each job status
+    JOB_STATUS_DETAILS = {
+        'PENDING': {
+            'label': 'Pending',
+            'description': 'Your repair request has been received and is awaiting review.',
+            'progress': 5,
+            'next_step': 'We will contact your insurance company to begin the claim process.',
+            'estimated_completion': '1-2 business days'
+        },
+        'INSURANCE_CONTACTED': {
+            'label': 'Insurance Contacted',
+            'description': 'We have contacted your insurance company to file the claim.',
+            'progress': 15,
+            'next_step': 'Waiting for insurance approval and adjuster assignment.',
+            'estimated_completion': '2-5 business days'
+        },
+        'INSURANCE_APPROVED': {
+            'label': 'Insurance Approved',
+            'description': 'Great news! Your insurance has approved the repair.',
+            'progress': 25,
+            'next_step': 'We will schedule your vehicle drop-off appointment.',
+            'estimated_completion': '1-2 business days'
+        },
+        'SCHEDULED': {
+            'label': 'Appointment Scheduled',
+            'description': 'Your repair appointment has been scheduled.',
+            'progress': 30,
+            'next_step': 'Please bring your vehicle at the scheduled time.',
+            'estimated_completion': 'See appointment date'
+        },
+        'CHECKED_IN': {
+            'label': 'Vehicle Checked In',
+            'description': 'Your vehicle has been received at our facility.',
+            'progress': 35,
+            'next_step': 'Our technicians will begin the repair process.',
+            'estimated_completion': '3-5 business days'
+        },
+        'IN_PROGRESS': {
+            'label': 'Repair In Progress',
+            'description': 'Our skilled technicians are actively working on your vehicle.',
+            'progress': 60,
+            'next_step': 'Quality inspection will be performed once repairs are complete.',
+            'estimated_completion': '1-3 business days'
+        },
+        'WAITING_PARTS': {
+            'label': 'Waiting for Parts',
+            'description': 'We are waiting for special parts needed for your repair.',
+            'progress': 50,
+            'next_step': 'Repairs will resume once parts arrive.',
+            'estimated_completion': '2-7 business days'
+        },
+        'QUALITY_CHECK': {
+            'label': 'Quality Inspection',
+            'description': 'Your vehicle is undergoing final quality inspection.',
+            'progress': 85,
+            'next_step': 'Vehicle will be ready for pickup soon.',
+            'estimated_completion': '1 business day'
+        },
+        'WAITING_PAYMENT': {
+            'label': 'Awaiting Payment',
+            'description': 'Repairs are complete. Awaiting final payment processing.',
+            'progress': 90,
+            'next_step': 'Complete payment to schedule pickup.',
+            'estimated_completion': 'Upon payment'
+        },
+        'READY_FOR_PICKUP': {
+            'label': 'Ready for Pickup',
+            'description': 'Your vehicle is ready! Please schedule a pickup time.',
+            'progress': 95,
+            'next_step': 'Contact us to arrange pickup.',
+            'estimated_completion': 'At your convenience'
+        },
+        'COMPLETED': {
+            'label': 'Completed',
+            'description': 'Your repair has been completed successfully.',
+            'progress': 100,
+            'next_step': 'Thank you for choosing us!',
+            'estimated_completion': 'Complete'
+        },
+        'DELIVERED': {
+            'label': 'Delivered',
+            'description': 'Your vehicle has been delivered. Enjoy your like-new vehicle!',
+            'progress': 100,
+            'next_step': 'Please leave us a review!',
+            'estimated_completion': 'Complete'
+        },
+        'CANCELLED': {
+            'label': 'Cancelled',
+            'description': 'This repair request has been cancelled.',
+            'progress': 0,
+            'next_step': 'Contact us if you have questions.',
+            'estimated_completion': 'N/A'
+        }
+    }
+
+    # Database paths whose portal tables have been created in this process
+    _schema_ready = set()
+
+    # Database paths whose referral tables have been created in this process
+    _referral_schema_ready = set()
+
+    # Database wrappers shared by managers constructed from the same path
+    _databases: Dict[str, Database] = {}
+
     def __init__(self, db):
         """Initialize customer portal manager with database instance"""
         if isinstance(db, str):
-            from ..models.database import Database
-            self.db = Database(db)
+            if db not in CustomerPortalManager._databases:
+                CustomerPortalManager._databases[db] = Database(db)
+            self.db = CustomerPortalManager._databases[db]
         else:
             self.db = db
         self._ensure_portal_tables()
 
     def _ensure_portal_tables(self):
-        """Ensure portal-related tables exist"""
+        """Ensure portal-related tables exist (once per database per process)"""
+        if self.db.db_path in CustomerPortalManager._schema_ready:
+            return
+
         # Customer portal access
         self.db.execute("""
             CREATE TABLE IF NOT EXISTS customer_portal_access (
@@ -176,6 +418,38 @@ class CustomerPortalManager:
             )
         """)
 
+        self._ensure_portal_indexes()
+
+        CustomerPortalManager._schema_ready.add(self.db.db_path)
+
+    def _ensure_portal_indexes(self):
+        """Ensure indexes behind the portal's customer-scoped queries exist"""
+        self.db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_lt_customer
+            ON loyalty_transactions(customer_id, transaction_type)
+        """)
+        self.db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_pm_customer
+            ON portal_messages(customer_id, status, created_at)
+        """)
+        self.db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_rev_job
+            ON customer_reviews(job_id)
+        """)
+
+        # Core CRM tables may be missing from stripped-down databases
+        for index_sql in (
+            "CREATE INDEX IF NOT EXISTS idx_inv_job ON invoices(job_id)",
+            "CREATE INDEX IF NOT EXISTS idx_inv_customer_date "
+            "ON invoices(customer_id, invoice_date DESC)",
+            "CREATE INDEX IF NOT EXISTS idx_jobs_customer_status "
+            "ON jobs(customer_id, status, completed_at DESC)",
+        ):
+            try:
+                self.db.execute(index_sql)
+            except sqlite3.OperationalError:
+                pass
+
     # ========================================================================
     # PORTAL ACCESS
     # ========================================================================
@@ -200,49 +474,49 @@ class CustomerPortalManager:
         # Generate access token
         access_token = secrets.token_urlsafe(32)
 
-        # Check if access already exists
-        existing = self.db.execute("""
-            SELECT * FROM customer_portal_access
-            WHERE customer_id = ?
-        """, (customer_id,))
-
-        if existing:
-            # Update existing
-            self.db.execute("""
-                UPDATE customer_portal_access
-                SET access_token = ?,
-                    email = ?,
-                    phone = ?,
-                    updated_at = ?
+        # Lookup and write share one transaction
+        with self.db.transaction():
+            # Check if access already exists
+            existing = self.db.execute("""
+                SELECT id FROM customer_portal_access
                 WHERE customer_id = ?
-            """, (
-                access_token,
-                email,
-                phone,
-                datetime.now().isoformat(),
-                customer_id
-            ))
-        else:
-            # Create new
-            self.db.execute("""
-                INSERT INTO customer_portal_access (
-                    customer_id, access_token, email, phone,
-                    created_at, status
-                ) VALUES (?, ?, ?, ?, ?, ?)
-            """, (
-                customer_id,
-                access_token,
-                email,
-                phone,
-                datetime.now().isoformat(),
-                'ACTIVE'
-            ))
-
-        portal_url = f"https://portal.yourshop.com/{access_token}"
-
-        print(f"[OK] Created portal access for customer {customer_id}")
-        print(f"     Email: {email}")
-        print(f"     Portal URL: {portal_url}")
+            """, (customer_id,))
+
+            if existing:
+                # Update existing
+                self.db.execute("""
+                    UPDATE customer_portal_access
+                    SET access_token = ?,
+                        email = ?,
+                        phone = ?,
+                        updated_at = ?
+                    WHERE customer_id = ?
+                """, (
+                    access_token,
+                    email,
+                    phone,
+                    datetime.now().isoformat(),
+                    customer_id
+                ))
+            else:
+                # Create new
+                self.db.execute("""
+                    INSERT INTO customer_portal_access (
+                        customer_id, access_token, email, phone,
+                        created_at, status
+                    ) VALUES (?, ?, ?, ?, ?, ?)
+                """, (
+                    customer_id,
+                    access_token,
+                    email,
+                    phone,
+                    datetime.now().isoformat(),
+                    'ACTIVE'
+                ))
+
+        portal_url = _PORTAL_BASE_URL + access_token
+
+        logger.info("Created portal access for customer %s (email: %s)", customer_id, email)
 
         return {
             'customer_id': customer_id,
@@ -251,6 +525,90 @@ class CustomerPortalManager:
             'email': email
         }
 
+    def create_portal_access_bulk(
+        self,
+        customers: List[Tuple[int, str, Optional[str]]]
+    ) -> List[Dict]:
+        """
+        Create portal access for many customers at once
+
+        Tokens are drawn from a single os.urandom() call and rows are
+        written with executemany, instead of one round trip per customer.
+
+        Args:
+            customers: List of (customer_id, email, phone) tuples
+
+        Returns:
+            List of portal access credentials, one per customer in input
+            order; a customer listed more than once gets its last entry
+        """
+        if not customers:
+            return []
+
+        # Last entry per customer, so a repeated id updates one row
+        customers = list({c[0]: c for c in customers}.values())
+
+        # One entropy read for the whole batch, same format as token_urlsafe(32)
+        raw = os.urandom(32 * len(customers))
+        tokens = [
+            base64.urlsafe_b64encode(raw[i:i + 32]).rstrip(b'=').decode('ascii')
+            for i in range(0, len(raw), 32)
+        ]
+
+        # One transaction for the whole batch: a single commit instead of one per customer
+        with self.db.transaction():
+            # Find customers that already have portal access, in chunks that
+            # stay under SQLite's bound-parameter limit
+            customer_ids = [c[0] for c in customers]
+            existing_ids = set()
+            for start in range(0, len(customer_ids), 500):
+                chunk = customer_ids[start:start + 500]
+                placeholders = ', '.join('?' for _ in chunk)
+                existing = self.db.execute(f"""
+                    SELECT customer_id FROM customer_portal_access
+                    WHERE customer_id IN ({placeholders})
+                """, tuple(chunk))
+                existing_ids.update(row['customer_id'] for row in existing)
+
+            now = datetime.now().isoformat()
+            updates = []
+            inserts = []
+            for (customer_id, email, phone), access_token in zip(customers, tokens):
+                if customer_id in existing_ids:
+                    updates.append((access_token, email, phone, now, customer_id))
+                else:
+                    inserts.append((customer_id, access_token, email, phone, now, 'ACTIVE'))
+
+            if updates:
+                self.db.execute_many("""
+                    UPDATE customer_portal_access
+                    SET access_token = ?,
+                        email = ?,
+                        phone = ?,
+                        updated_at = ?
+                    WHERE customer_id = ?
+                """, updates)
+
+            if inserts:
+                self.db.execute_many("""
+                    INSERT INTO customer_portal_access (
+                        customer_id, access_token, email, phone,
+                        created_at, status
+                    ) VALUES (?, ?, ?, ?, ?, ?)
+                """, inserts)
+
+        logger.info("Created portal access for %d customers", len(customers))
+
+        return [
+            {
+                'customer_id': customer_id,
+                'access_token': access_token,
+                'portal_url': _PORTAL_BASE_URL + access_token,
+                'email': email
+            }
+            for (customer_id, email, _), access_token in zip(customers, tokens)
+        ]
+
     def send_portal_invite(
         self,
         customer_id: int,
@@ -263,11 +621,10 @@ class CustomerPortalManager:
             customer_id: Customer ID
             email: Customer email
         """
-        access = self.create_portal_access(customer_id, email)
+        self.create_portal_access(customer_id, email)
 
         # In production, send actual email
-        print(f"[OK] Portal invite sent to {email}")
-        print(f"     Portal URL: {access['portal_url']}")
+        logger.info("Portal invite sent to %s", email)
 
         return True
 
@@ -288,7 +645,7 @@ class CustomerPortalManager:
             WHERE access_token = ?
         """, (datetime.now().isoformat(), access_token))
 
-        return dict(result[0])
+        return result[0]
 
     def customer_login(
         self,
@@ -365,25 +722,25 @@ class CustomerPortalManager:
         Returns:
             List of available time slots
         """
+        # Booked counts for every slot that day in one query
+        booked = self.db.execute("""
+            SELECT service_time, COUNT(*) as count FROM portal_appointments
+            WHERE service_date = ?
+              AND status NOT IN ('CANCELLED')
+            GROUP BY service_time
+        """, (service_date.isoformat(),))
+        booked_counts = {row['service_time']: row['count'] for row in booked}
+
         slots = []
 
         # Business hours: 8 AM - 5 PM
         for hour in range(8, 17):
             slot_time = f"{hour:02d}:00"
 
-            # Check existing appointments
-            existing = self.db.execute("""
-                SELECT COUNT(*) as count FROM portal_appointments
-                WHERE service_date = ? AND service_time = ?
-                  AND status NOT IN ('CANCELLED')
-            """, (service_date.isoformat(), slot_time))
-
-            # Assume max 2 appointments per slot
-            available = existing[0]['count'] < 2 if existing else True
-
             slots.append({
                 'time': slot_time,
-                'available': available,
+                # Assume max 2 appointments per slot
+                'available': booked_counts.get(slot_time, 0) < 2,
                 'duration_hours': 2.0,
                 'service_type': service_type
             })
@@ -417,14 +774,7 @@ class CustomerPortalManager:
         Returns:
             Appointment ID
         """
-        result = self.db.execute("""
-            INSERT INTO portal_appointments (
-                customer_id, service_date, service_time,
-                service_type, vehicle_info, damage_description,
-                contact_preference, notes,
-                created_at, status
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+        result = self.db.execute(_SQL_INSERT_APPOINTMENT, (
             customer_id,
             service_date.isoformat(),
             service_time,
@@ -439,11 +789,11 @@ class CustomerPortalManager:
 
         appointment_id = result[0]['id']
 
-        print(f"[OK] Appointment booked via portal")
-        print(f"     Customer ID: {customer_id}")
-        print(f"     Date: {service_date.strftime('%B %d, %Y')}")
-        print(f"     Time: {service_time}")
-        print(f"     Vehicle: {vehicle_info['year']} {vehicle_info['make']} {vehicle_info['model']}")
+        logger.info(
+            "Appointment %s booked via portal: customer %s on %s at %s (%s %s %s)",
+            appointment_id, customer_id, service_date, service_time,
+            vehicle_info.get('year'), vehicle_info.get('make'), vehicle_info.get('model')
+        )
 
         return appointment_id
 
@@ -452,30 +802,28 @@ class CustomerPortalManager:
         customer_id: int,
         upcoming_only: bool = True
     ) -> List[Dict]:
-        """Get customer appointments"""
+        """
+        Get customer appointments
+
+        Vehicle details come back flat as vehicle_year, vehicle_make and
+        vehicle_model rather than a vehicle_info dict.
+        """
         if upcoming_only:
-            results = self.db.execute("""
-                SELECT * FROM portal_appointments
+            return self.db.execute(f"""
+                SELECT {_APPOINTMENT_COLUMNS}
+                FROM portal_appointments
                 WHERE customer_id = ?
                   AND service_date >= ?
                   AND status != 'CANCELLED'
                 ORDER BY service_date, service_time
             """, (customer_id, date.today().isoformat()))
-        else:
-            results = self.db.execute("""
-                SELECT * FROM portal_appointments
-                WHERE customer_id = ?
-                ORDER BY service_date DESC, service_time
-            """, (customer_id,))
-
-        appointments = []
-        for row in results:
-            appt = dict(row)
-            if appt.get('vehicle_info'):
-                appt['vehicle_info'] = json.loads(appt['vehicle_info'])
-            appointments.append(appt)
 
-        return appointments
+        return self.db.execute(f"""
+            SELECT {_APPOINTMENT_COLUMNS}
+            FROM portal_appointments
+            WHERE customer_id = ?
+            ORDER BY service_date DESC, service_time
+        """, (customer_id,))
 
     def cancel_appointment(
         self,
@@ -483,6 +831,8 @@ class CustomerPortalManager:
         cancellation_reason: Optional[str] = None
     ) -> bool:
         """Cancel appointment through portal"""
+        now = datetime.now().isoformat()
+
         self.db.execute("""
             UPDATE portal_appointments
             SET status = 'CANCELLED',
@@ -491,13 +841,13 @@ class CustomerPortalManager:
                 updated_at = ?
             WHERE id = ?
         """, (
-            datetime.now().isoformat(),
+            now,
             cancellation_reason,
-            datetime.now().isoformat(),
+            now,
             appointment_id
         ))
 
-        print(f"[OK] Appointment {appointment_id} cancelled")
+        logger.info("Appointment %s cancelled", appointment_id)
 
         return True
 
@@ -528,13 +878,7 @@ class CustomerPortalManager:
         Returns:
             Estimate request ID
         """
-        result = self.db.execute("""
-            INSERT INTO portal_estimate_requests (
-                customer_id, vehicle_info, damage_description,
-                photo_urls, preferred_contact, urgency,
-                created_at, status
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+        result = self.db.execute(_SQL_INSERT_ESTIMATE_REQUEST, (
             customer_id,
             json.dumps(vehicle_info),
             damage_description,
@@ -547,11 +891,12 @@ class CustomerPortalManager:
 
         request_id = result[0]['id']
 
-        print(f"[OK] Estimate request submitted")
-        print(f"     Customer ID: {customer_id}")
-        print(f"     Vehicle: {vehicle_info['year']} {vehicle_info['make']} {vehicle_info['model']}")
-        print(f"     Photos: {len(photo_urls) if photo_urls else 0}")
-        print(f"     Urgency: {urgency}")
+        logger.info(
+            "Estimate request %s submitted: customer %s, %s %s %s, %d photos, urgency %s",
+            request_id, customer_id,
+            vehicle_info.get('year'), vehicle_info.get('make'), vehicle_info.get('model'),
+            len(photo_urls) if photo_urls else 0, urgency
+        )
 
         return request_id
 
@@ -570,47 +915,47 @@ class CustomerPortalManager:
         Returns:
             Number of photos uploaded
         """
-        for photo in photos:
-            self.db.execute("""
-                INSERT INTO portal_estimate_photos (
-                    request_id, photo_url, photo_type,
-                    description, uploaded_at
-                ) VALUES (?, ?, ?, ?, ?)
-            """, (
+        uploaded_at = datetime.now().isoformat()
+        self.db.execute_many(_SQL_INSERT_ESTIMATE_PHOTO, [
+            (
                 request_id,
                 photo.get('url'),
                 photo.get('type', 'damage'),
                 photo.get('description'),
-                datetime.now().isoformat()
-            ))
+                uploaded_at
+            )
+            for photo in photos
+        ])
 
-        print(f"[OK] Uploaded {len(photos)} photos for estimate request {request_id}")
+        logger.info("Uploaded %d photos for estimate request %s", len(photos), request_id)
 
         return len(photos)
 
     def get_estimate_request(self, request_id: int) -> Optional[Dict]:
         """Get estimate request details"""
+        # Request and its photos in one round trip; SQLite builds the photo list
+        # and the [JSON] column aliases are decoded while the rows are fetched
         result = self.db.execute("""
-            SELECT * FROM portal_estimate_requests WHERE id = ?
+            SELECT r.id, r.customer_id,
+                   r.vehicle_info AS "vehicle_info [JSON]",
+                   r.damage_description,
+                   r.photo_urls AS "photo_urls [JSON]",
+                   r.preferred_contact, r.urgency, r.estimated_amount,
+                   r.responded_at, r.created_at, r.status,
+                   COALESCE(json_group_array(json_object(
+                       'id', p.id,
+                       'photo_url', p.photo_url,
+                       'photo_type', p.photo_type,
+                       'description', p.description,
+                       'uploaded_at', p.uploaded_at
+                   )) FILTER (WHERE p.id IS NOT NULL), '[]') AS "photos [JSON]"
+            FROM portal_estimate_requests r
+            LEFT JOIN portal_estimate_photos p ON p.request_id = r.id
+            WHERE r.id = ?
+            GROUP BY r.id
         """, (request_id,))
 
-        if not result:
-            return None
-
-        request = dict(result[0])
-        if request.get('vehicle_info'):
-            request['vehicle_info'] = json.loads(request['vehicle_info'])
-        if request.get('photo_urls'):
-            request['photo_urls'] = json.loads(request['photo_urls'])
-
-        # Get photos
-        photos = self.db.execute("""
-            SELECT * FROM portal_estimate_photos WHERE request_id = ?
-        """, (request_id,))
-
-        request['photos'] = [dict(p) for p in photos]
-
-        return request
+        return result[0] if result else None
 
     # ========================================================================
     # JOB TRACKING
@@ -633,13 +978,17 @@ class CustomerPortalManager:
         """
         if job_id:
             jobs = self.db.execute("""
-                SELECT * FROM jobs
+                SELECT id, vehicle_id, status, estimated_completion_date,
+                       tech_notes, created_at
+                FROM jobs
                 WHERE id = ? AND customer_id = ?
             """, (job_id, customer_id))
         else:
             # Get all active jobs
             jobs = self.db.execute("""
-                SELECT * FROM jobs
+                SELECT id, vehicle_id, status, estimated_completion_date,
+                       tech_notes, created_at
+                FROM jobs
                 WHERE customer_id = ?
                   AND status NOT IN ('COMPLETED', 'DELIVERED', 'CANCELLED')
                 ORDER BY created_at DESC
@@ -648,48 +997,30 @@ class CustomerPortalManager:
         job_statuses = []
 
         for job in jobs:
-            job_dict = dict(job)
-
             # Get vehicle info
             vehicle = None
-            if job_dict.get('vehicle_id'):
+            if job['vehicle_id']:
                 vehicle_data = self.db.execute(
-                    "SELECT * FROM vehicles WHERE id = ?",
-                    (job_dict['vehicle_id'],)
+                    "SELECT id, year, make, model, color, vin FROM vehicles WHERE id = ?",
+                    (job['vehicle_id'],)
                 )
-                vehicle = dict(vehicle_data[0]) if vehicle_data else None
-
-            # Calculate progress
-            progress_percent = self._calculate_job_progress(job_dict['status'])
+                vehicle = vehicle_data[0] if vehicle_data else None
 
-            job_status = {
-                'job_id': job_dict['id'],
-                'status': job_dict['status'],
-                'progress_percent': progress_percent,
-                'estimated_completion': job_dict.get('estimated_completion_date'),
+            job_statuses.append({
+                'job_id': job['id'],
+                'status': job['status'],
+                'progress_percent': self._calculate_job_progress(job['status']),
+                'estimated_completion': job['estimated_completion_date'],
                 'vehicle': vehicle,
-                'description': job_dict.get('tech_notes'),
-                'created_at': job_dict['created_at']
-            }
-
-            job_statuses.append(job_status)
+                'description': job['tech_notes'],
+                'created_at': job['created_at']
+            })
 
         return job_statuses
 
     def _calculate_job_progress(self, status: str) -> int:
         """Calculate job progress percentage based on status"""
-        progress_map = {
-            'PENDING': 0,
-            'SCHEDULED': 10,
-            'CHECKED_IN': 20,
-            'IN_PROGRESS': 50,
-            'QUALITY_CHECK': 80,
-            'READY_FOR_PICKUP': 95,
-            'COMPLETED': 100,
-            'DELIVERED': 100
-        }
-
-        return progress_map.get(status, 0)
+        return self.JOB_PROGRESS.get(status, 0)
 
     def get_status_timeline(self, job_id: int) -> List[Dict]:
         """
@@ -705,7 +1036,7 @@ class CustomerPortalManager:
         """
         # Query job_status_history for all status changes
         history = self.db.execute("""
-            SELECT * FROM job_status_history
+            SELECT to_status, changed_at, notes FROM job_status_history
             WHERE job_id = ?
             ORDER BY changed_at ASC
         """, (job_id,))
@@ -730,7 +1061,7 @@ class CustomerPortalManager:
         else:
             # No history - get current job status
             job = self.db.execute(
-                "SELECT * FROM jobs WHERE id = ?",
+                "SELECT status, created_at FROM jobs WHERE id = ?",
                 (job_id,)
             )
 
@@ -760,108 +1091,19 @@ class CustomerPortalManager:
         Returns:
             Dictionary with label, description, progress, next_step, estimated_completion
         """
-        status_map = {
-            'PENDING': {
-                'label': 'Pending',
-                'description': 'Your repair request has been received and is awaiting review.',
-                'progress': 5,
-                'next_step': 'We will contact your insurance company to begin the claim process.',
-                'estimated_completion': '1-2 business days'
-            },
-            'INSURANCE_CONTACTED': {
-                'label': 'Insurance Contacted',
-                'description': 'We have contacted your insurance company to file the claim.',
-                'progress': 15,
-                'next_step': 'Waiting for insurance approval and adjuster assignment.',
-                'estimated_completion': '2-5 business days'
-            },
-            'INSURANCE_APPROVED': {
-                'label': 'Insurance Approved',
-                'description': 'Great news! Your insurance has approved the repair.',
-                'progress': 25,
-                'next_step': 'We will schedule your vehicle drop-off appointment.',
-                'estimated_completion': '1-2 business days'
-            },
-            'SCHEDULED': {
-                'label': 'Appointment Scheduled',
-                'description': 'Your repair appointment has been scheduled.',
-                'progress': 30,
-                'next_step': 'Please bring your vehicle at the scheduled time.',
-                'estimated_completion': 'See appointment date'
-            },
-            'CHECKED_IN': {
-                'label': 'Vehicle Checked In',
-                'description': 'Your vehicle has been received at our facility.',
-                'progress': 35,
-                'next_step': 'Our technicians will begin the repair process.',
-                'estimated_completion': '3-5 business days'
-            },
-            'IN_PROGRESS': {
-                'label': 'Repair In Progress',
-                'description': 'Our skilled technicians are actively working on your vehicle.',
-                'progress': 60,
-                'next_step': 'Quality inspection will be performed once repairs are complete.',
-                'estimated_completion': '1-3 business days'
-            },
-            'WAITING_PARTS': {
-                'label': 'Waiting for Parts',
-                'description': 'We are waiting for special parts needed for your repair.',
-                'progress': 50,
-                'next_step': 'Repairs will resume once parts arrive.',
-                'estimated_completion': '2-7 business days'
-            },
-            'QUALITY_CHECK': {
-                'label': 'Quality Inspection',
-                'description': 'Your vehicle is undergoing final quality inspection.',
-                'progress': 85,
-                'next_step': 'Vehicle will be ready for pickup soon.',
-                'estimated_completion': '1 business day'
-            },
-            'WAITING_PAYMENT': {
-                'label': 'Awaiting Payment',
-                'description': 'Repairs are complete. Awaiting final payment processing.',
-                'progress': 90,
-                'next_step': 'Complete payment to schedule pickup.',
-                'estimated_completion': 'Upon payment'
-            },
-            'READY_FOR_PICKUP': {
-                'label': 'Ready for Pickup',
-                'description': 'Your vehicle is ready! Please schedule a pickup time.',
-                'progress': 95,
-                'next_step': 'Contact us to arrange pickup.',
-                'estimated_completion': 'At your convenience'
-            },
-            'COMPLETED': {
-                'label': 'Completed',
-                'description': 'Your repair has been completed successfully.',
-                'progress': 100,
-                'next_step': 'Thank you for choosing us!',
-                'estimated_completion': 'Complete'
-            },
-            'DELIVERED': {
-                'label': 'Delivered',
-                'description': 'Your vehicle has been delivered. Enjoy your like-new vehicle!',
-                'progress': 100,
-                'next_step': 'Please leave us a review!',
-                'estimated_completion': 'Complete'
-            },
-            'CANCELLED': {
-                'label': 'Cancelled',
-                'description': 'This repair request has been cancelled.',
-                'progress': 0,
-                'next_step': 'Contact us if you have questions.',
-                'estimated_completion': 'N/A'
-            }
-        }
+        details = self.JOB_STATUS_DETAILS.get(status)
+        if details is not None:
+            # Copy, so callers can't change the shared table
+            return dict(details)
 
         # Return default if status not found
-        return status_map.get(status, {
+        return {
             'label': status.replace('_', ' ').title(),
             'description': f'Current status: {status}',
             'progress': 50,
             'next_step': 'Contact us for more information.',
             'estimated_completion': 'Contact for estimate'
-        })
+        }
 
     # ========================================================================
     # SERVICE HISTORY
@@ -882,47 +1124,52 @@ class CustomerPortalManager:
         Returns:
             List of past services
         """
-        jobs = self.db.execute("""
-            SELECT * FROM jobs
-            WHERE customer_id = ?
-              AND status IN ('COMPLETED', 'DELIVERED')
-            ORDER BY completed_at DESC
+        return list(self.iter_service_history(customer_id, limit))
+
+    def iter_service_history(
+        self,
+        customer_id: int,
+        limit: int = 10
+    ) -> Iterator[Dict]:
+        """Yield past services one at a time (see get_service_history)"""
+        # Jobs, vehicles and invoices in one round trip (first invoice per job)
+        rows = self.db.iter_rows("""
+            SELECT j.id AS job_id, j.completed_at, j.tech_notes,
+                   v.id AS vehicle_id, v.year AS v_year, v.make AS v_make, v.model AS v_model,
+                   v.color AS v_color, v.vin AS v_vin,
+                   i.id AS invoice_id, i.total AS invoice_total
+            FROM jobs j
+            LEFT JOIN vehicles v ON v.id = j.vehicle_id
+            LEFT JOIN invoices i ON i.id = (
+                SELECT MIN(id) FROM invoices WHERE job_id = j.id
+            )
+            WHERE j.customer_id = ?
+              AND j.status IN ('COMPLETED', 'DELIVERED')
+            ORDER BY j.completed_at DESC
             LIMIT ?
         """, (customer_id, limit))
 
-        history = []
-
-        for job in jobs:
-            job_dict = dict(job)
-
-            # Get vehicle
+        for row in rows:
             vehicle = None
-            if job_dict.get('vehicle_id'):
-                vehicle_data = self.db.execute(
-                    "SELECT * FROM vehicles WHERE id = ?",
-                    (job_dict['vehicle_id'],)
-                )
-                vehicle = dict(vehicle_data[0]) if vehicle_data else None
-
-            # Get invoice
-            invoice = self.db.execute(
-                "SELECT * FROM invoices WHERE job_id = ?",
-                (job_dict['id'],)
-            )
-
-            history_item = {
-                'job_id': job_dict['id'],
-                'service_date': job_dict.get('completed_at'),
+            if row['vehicle_id'] is not None:
+                vehicle = {
+                    'id': row['vehicle_id'],
+                    'year': row['v_year'],
+                    'make': row['v_make'],
+                    'model': row['v_model'],
+                    'color': row['v_color'],
+                    'vin': row['v_vin']
+                }
+
+            yield {
+                'job_id': row['job_id'],
+                'service_date': row['completed_at'],
                 'vehicle': vehicle,
-                'description': job_dict.get('tech_notes'),
-                'total_cost': invoice[0]['total'] if invoice else None,
-                'invoice_id': invoice[0]['id'] if invoice else None
+                'description': row['tech_notes'],
+                'total_cost': row['invoice_total'],
+                'invoice_id': row['invoice_id']
             }
 
-            history.append(history_item)
-
-        return history
-
     # ========================================================================
     # INVOICE & PAYMENT
     # ========================================================================
@@ -942,20 +1189,24 @@ class CustomerPortalManager:
         Returns:
             List of invoices
         """
+        # invoices carries customer_id itself, so no join through jobs
         query = """
-            SELECT i.* FROM invoices i
-            JOIN jobs j ON j.id = i.job_id
-            WHERE j.customer_id = ?
+            SELECT
+                id, invoice_number, job_id, status,
+                total, amount_paid, balance_due,
+                invoice_date, due_date
+            FROM invoices
+            WHERE customer_id = ?
         """
 
         if unpaid_only:
-            query += " AND i.balance_due > 0"
+            query += " AND balance_due > 0"
 
-        query += " ORDER BY i.invoice_date DESC"
+        query += " ORDER BY invoice_date DESC"
 
         invoices = self.db.execute(query, (customer_id,))
 
-        return [dict(inv) for inv in invoices]
+        return invoices
 
     def create_payment_link(
         self,
@@ -975,6 +1226,10 @@ class CustomerPortalManager:
         # Generate payment token
         payment_token = secrets.token_urlsafe(32)
 
+        # One clock read so the stored and returned expiry match exactly
+        now = datetime.now()
+        expires_at = (now + timedelta(hours=24)).isoformat()
+
         self.db.execute("""
             INSERT INTO payment_links (
                 invoice_id, payment_token, amount,
@@ -984,24 +1239,21 @@ class CustomerPortalManager:
             invoice_id,
             payment_token,
             amount,
-            datetime.now().isoformat(),
-            (datetime.now() + timedelta(hours=24)).isoformat(),
+            now.isoformat(),
+            expires_at,
             'ACTIVE'
         ))
 
-        payment_url = f"https://pay.yourshop.com/{payment_token}"
+        payment_url = _PAY_BASE_URL + payment_token
 
-        print(f"[OK] Payment link created")
-        print(f"     Invoice: {invoice_id}")
-        print(f"     Amount: ${amount:,.2f}")
-        print(f"     URL: {payment_url}")
+        logger.info("Payment link created for invoice %s (amount: $%.2f)", invoice_id, amount)
 
         return {
             'invoice_id': invoice_id,
             'payment_token': payment_token,
             'payment_url': payment_url,
             'amount': amount,
-            'expires_at': (datetime.now() + timedelta(hours=24)).isoformat()
+            'expires_at': expires_at
         }
 
     # ========================================================================
@@ -1034,93 +1286,69 @@ class CustomerPortalManager:
         if rating < 1 or rating > 5:
             raise ValueError("Rating must be between 1 and 5")
 
-        result = self.db.execute("""
-            INSERT INTO customer_reviews (
-                customer_id, job_id, rating, review_text,
-                would_recommend, review_categories,
-                created_at, status
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+        result = self.db.execute(_SQL_INSERT_REVIEW, (
             customer_id,
             job_id,
             rating,
             review_text,
             1 if would_recommend else 0,
-            json.dumps(review_categories) if review_categories else None,
+            _json_dumps(review_categories) if review_categories else None,
             datetime.now().isoformat(),
             'PUBLISHED'
         ))
 
         review_id = result[0]['id']
 
-        stars = '*' * rating
-        print(f"[OK] Review submitted")
-        print(f"     Job ID: {job_id}")
-        print(f"     Rating: {rating}/5 {stars}")
-        print(f"     Would recommend: {would_recommend}")
+        logger.info(
+            "Review %s submitted for job %s: %s/5, would recommend: %s",
+            review_id, job_id, rating, would_recommend
+        )
 
         return review_id
 
     def get_customer_reviews(self, customer_id: int) -> List[Dict]:
         """Get all reviews by customer"""
-        results = self.db.execute("""
-            SELECT * FROM customer_reviews
+        return list(self.iter_customer_reviews(customer_id))
+
+    def iter_customer_reviews(self, customer_id: int) -> Iterator[Dict]:
+        """Yield the customer's reviews one at a time, newest first"""
+        return self.db.iter_rows("""
+            SELECT id, customer_id, job_id, rating, review_text,
+                   would_recommend,
+                   review_categories AS "review_categories [JSON]",
+                   created_at, status
+            FROM customer_reviews
             WHERE customer_id = ?
             ORDER BY created_at DESC
         """, (customer_id,))
 
-        reviews = []
-        for row in results:
-            review = dict(row)
-            if review.get('review_categories'):
-                review['review_categories'] = json.loads(review['review_categories'])
-            reviews.append(review)
-
-        return reviews
-
     def get_review_request(self, job_id: int) -> Optional[Dict]:
         """
         Get review request for completed job
 
         Returns review request if job is eligible
         """
-        job = self.db.execute(
-            "SELECT * FROM jobs WHERE id = ?",
-            (job_id,)
-        )
-
-        if not job:
-            return None
-
-        job = dict(job[0])
-
-        if job['status'] not in ('COMPLETED', 'DELIVERED'):
-            return None
-
-        # Check if already reviewed
-        existing_review = self.db.execute(
-            "SELECT * FROM customer_reviews WHERE job_id = ?",
-            (job_id,)
-        )
-
-        if existing_review:
-            return None
-
-        # Get customer
-        customer = self.db.execute(
-            "SELECT * FROM customers WHERE id = ?",
-            (job['customer_id'],)
-        )
+        # Eligibility (completed, not yet reviewed) and customer name in one query
+        result = self.db.execute("""
+            SELECT j.completed_at, c.first_name, c.last_name
+            FROM jobs j
+            JOIN customers c ON c.id = j.customer_id
+            WHERE j.id = ?
+              AND j.status IN ('COMPLETED', 'DELIVERED')
+              AND NOT EXISTS (
+                  SELECT 1 FROM customer_reviews r WHERE r.job_id = j.id
+              )
+        """, (job_id,))
 
-        if not customer:
+        if not result:
             return None
 
-        customer = dict(customer[0])
+        row = result[0]
 
         return {
             'job_id': job_id,
-            'customer_name': f"{customer['first_name']} {customer['last_name']}",
-            'completed_at': job.get('completed_at'),
+            'customer_name': f"{row['first_name']} {row['last_name']}",
+            'completed_at': row['completed_at'],
             'eligible_for_review': True
         }
 
@@ -1147,13 +1375,7 @@ class CustomerPortalManager:
         Returns:
             Message ID
         """
-        result = self.db.execute("""
-            INSERT INTO portal_messages (
-                customer_id, subject, message,
-                related_job_id, sender_type,
-                created_at, status
-            ) VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (
+        result = self.db.execute(_SQL_INSERT_MESSAGE, (
             customer_id,
             subject,
             message,
@@ -1165,8 +1387,7 @@ class CustomerPortalManager:
 
         message_id = result[0]['id']
 
-        print(f"[OK] Message sent from customer {customer_id}")
-        print(f"     Subject: {subject}")
+        logger.info("Message %s sent from customer %s", message_id, customer_id)
 
         return message_id
 
@@ -1176,8 +1397,19 @@ class CustomerPortalManager:
         unread_only: bool = False
     ) -> List[Dict]:
         """Get customer messages"""
+        return list(self.iter_messages(customer_id, unread_only))
+
+    def iter_messages(
+        self,
+        customer_id: int,
+        unread_only: bool = False
+    ) -> Iterator[Dict]:
+        """Yield customer messages one at a time, newest first"""
         query = """
-            SELECT * FROM portal_messages
+            SELECT
+                id, subject, message, related_job_id, sender_type,
+                read_at, created_at, status
+            FROM portal_messages
             WHERE customer_id = ?
         """
 
@@ -1186,9 +1418,16 @@ class CustomerPortalManager:
 
         query += " ORDER BY created_at DESC"
 
-        messages = self.db.execute(query, (customer_id,))
+        return self.db.iter_rows(query, (customer_id,))
+
+    def count_unread_messages(self, customer_id: int) -> int:
+        """Count unread messages without fetching them"""
+        result = self.db.execute("""
+            SELECT COUNT(*) as count FROM portal_messages
+            WHERE customer_id = ? AND status = 'UNREAD'
+        """, (customer_id,))
 
-        return [dict(m) for m in messages]
+        return result[0]['count']
 
     def mark_message_read(self, message_id: int) -> bool:
         """Mark message as read"""
@@ -1211,25 +1450,19 @@ class CustomerPortalManager:
 
         Returns points summary
         """
-        # Get total points earned
-        earned = self.db.execute("""
-            SELECT COALESCE(SUM(points_earned), 0) as total
-            FROM loyalty_transactions
-            WHERE customer_id = ?
-              AND transaction_type = 'EARNED'
-        """, (customer_id,))
-
-        total_earned = earned[0]['total'] if earned else 0
-
-        # Get points redeemed
-        redeemed = self.db.execute("""
-            SELECT COALESCE(SUM(ABS(points_earned)), 0) as total
+        # Earned and redeemed totals in one pass
+        totals = self.db.execute("""
+            SELECT
+                COALESCE(SUM(CASE WHEN transaction_type = 'EARNED'
+                                  THEN points_earned ELSE 0 END), 0) as earned,
+                COALESCE(SUM(CASE WHEN transaction_type = 'REDEEMED'
+                                  THEN ABS(points_earned) ELSE 0 END), 0) as redeemed
             FROM loyalty_transactions
             WHERE customer_id = ?
-              AND transaction_type = 'REDEEMED'
         """, (customer_id,))
 
-        total_redeemed = redeemed[0]['total'] if redeemed else 0
+        total_earned = totals[0]['earned'] if totals else 0
+        total_redeemed = totals[0]['redeemed'] if totals else 0
 
         # Calculate balance
         balance = total_earned - total_redeemed
@@ -1246,7 +1479,9 @@ class CustomerPortalManager:
             'tier_benefits': self._get_tier_benefits(tier)
         }
 
-    def _calculate_loyalty_tier(self, total_points: int) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def _calculate_loyalty_tier(total_points: int) -> str:
         """Calculate loyalty tier based on points"""
         if total_points >= 5000:
             return 'PLATINUM'
@@ -1259,32 +1494,7 @@ class CustomerPortalManager:
 
     def _get_tier_benefits(self, tier: str) -> List[str]:
         """Get benefits for loyalty tier"""
-        benefits = {
-            'BRONZE': [
-                '1 point per $1 spent',
-                'Birthday discount'
-            ],
-            'SILVER': [
-                '1.5 points per $1 spent',
-                'Birthday discount',
-                '5% off all services'
-            ],
-            'GOLD': [
-                '2 points per $1 spent',
-                'Birthday discount',
-                '10% off all services',
-                'Priority scheduling'
-            ],
-            'PLATINUM': [
-                '2.5 points per $1 spent',
-                'Birthday discount',
-                '15% off all services',
-                'Priority scheduling',
-                'Free annual detail'
-            ]
-        }
-
-        return benefits.get(tier, benefits['BRONZE'])
+        return _TIER_BENEFITS.get(tier, _TIER_BENEFITS['BRONZE'])
 
     def add_loyalty_points(
         self,
@@ -1295,12 +1505,7 @@ class CustomerPortalManager:
         related_invoice_id: Optional[int] = None
     ) -> int:
         """Add loyalty points for customer"""
-        result = self.db.execute("""
-            INSERT INTO loyalty_transactions (
-                customer_id, transaction_type, points_earned,
-                description, related_invoice_id, created_at
-            ) VALUES (?, ?, ?, ?, ?, ?)
-        """, (
+        result = self.db.execute(_SQL_INSERT_LOYALTY_TRANSACTION, (
             customer_id,
             transaction_type,
             points,
@@ -1318,20 +1523,22 @@ class CustomerPortalManager:
         description: str
     ) -> bool:
         """Redeem loyalty points"""
-        # Check balance
-        loyalty = self.get_loyalty_points(customer_id)
-
-        if loyalty['points_balance'] < points:
-            raise ValueError("Insufficient points balance")
-
-        self.add_loyalty_points(
-            customer_id=customer_id,
-            points=-points,
-            description=description,
-            transaction_type='REDEEMED'
-        )
+        # Balance check and debit share one write transaction so two
+        # concurrent redemptions cannot both pass the check
+        with self.db.transaction():
+            loyalty = self.get_loyalty_points(customer_id)
+
+            if loyalty['points_balance'] < points:
+                raise ValueError("Insufficient points balance")
+
+            self.add_loyalty_points(
+                customer_id=customer_id,
+                points=-points,
+                description=description,
+                transaction_type='REDEEMED'
+            )
 
-        print(f"[OK] Redeemed {points} points for customer {customer_id}")
+        logger.info("Redeemed %d points for customer %s", points, customer_id)
 
         return True
 
@@ -1345,41 +1552,29 @@ class CustomerPortalManager:
 
         Returns all portal data for customer
         """
-        # Get customer info
-        customer = self.db.execute(
-            "SELECT * FROM customers WHERE id = ?",
-            (customer_id,)
-        )
-
-        customer_info = dict(customer[0]) if customer else {}
-
-        # Get active jobs
-        active_jobs = self.get_job_status(customer_id)
-
-        # Get upcoming appointments
-        appointments = self.get_customer_appointments(customer_id, upcoming_only=True)
-
-        # Get unpaid invoices
-        unpaid_invoices = self.get_customer_invoices(customer_id, unpaid_only=True)
-
-        # Get loyalty points
-        loyalty = self.get_loyalty_points(customer_id)
-
-        # Get unread messages
-        unread_messages = self.get_messages(customer_id, unread_only=True)
+        # Create referral tables up front so the snapshot below stays read-only
+        self._ensure_referral_tables()
 
-        # Get referral summary
-        referral_summary = self.get_referral_summary(customer_id)
+        # One read transaction: every section shares a single connection and
+        # sees the same snapshot of the database
+        with self.db.transaction(immediate=False):
+            customer = self.db.execute(
+                "SELECT * FROM customers WHERE id = ?", (customer_id,)
+            )
 
-        return {
-            'customer': customer_info,
-            'active_jobs': active_jobs,
-            'upcoming_appointments': appointments,
-            'unpaid_invoices': unpaid_invoices,
-            'loyalty': loyalty,
-            'unread_messages': len(unread_messages),
-            'referrals': referral_summary
-        }
+            return {
+                'customer': customer[0] if customer else {},
+                'active_jobs': self.get_job_status(customer_id),
+                'upcoming_appointments': self.get_customer_appointments(
+                    customer_id, upcoming_only=True
+                ),
+                'unpaid_invoices': self.get_customer_invoices(
+                    customer_id, unpaid_only=True
+                ),
+                'loyalty': self.get_loyalty_points(customer_id),
+                'unread_messages': self.count_unread_messages(customer_id),
+                'referrals': self.get_referral_summary(customer_id)
+            }
 
     # ========================================================================
     # REFERRAL TRACKING & COMMISSIONS
@@ -1387,55 +1582,88 @@ class CustomerPortalManager:
 
     def get_referral_dashboard(
         self,
-        customer_id: int
+        customer_id: int,
+        detailed: bool = True
     ) -> Dict:
         """
         Get customer's referral dashboard
 
         Shows referrals, commissions, and earnings
+
+        Args:
+            customer_id: Customer ID
+            detailed: Include the formatted referral and payment lists;
+                pass False when only the summary and earnings are needed
         """
         # Ensure referral tables exist
         self._ensure_referral_tables()
 
-        # Get all referrals made by this customer
-        referrals = self.db.execute("""
-            SELECT
-                cr.*,
-                c.first_name, c.last_name, c.phone
+        # Referral counts by status, aggregated by SQLite
+        status_counts = self.db.execute("""
+            SELECT cr.status, COUNT(*) as count
             FROM customer_referrals cr
             JOIN customers c ON c.id = cr.referred_customer_id
             WHERE cr.referrer_customer_id = ?
-            ORDER BY cr.created_at DESC
+            GROUP BY cr.status
         """, (customer_id,))
+        counts = {row['status']: row['count'] for row in status_counts}
 
         # Calculate statistics
-        total_referrals = len(referrals)
-        pending_referrals = sum(1 for r in referrals if r['status'] == 'PENDING')
-        scheduled_referrals = sum(1 for r in referrals if r['status'] == 'SCHEDULED')
-        completed_referrals = sum(1 for r in referrals if r['status'] == 'COMPLETED')
+        total_referrals = sum(counts.values())
+        pending_referrals = counts.get('PENDING', 0)
+        scheduled_referrals = counts.get('SCHEDULED', 0)
+        completed_referrals = counts.get('COMPLETED', 0)
+
+        referrals = []
+        if detailed:
+            # Get all referrals made by this customer
+            referrals = self.db.execute("""
+                SELECT
+                    cr.id, cr.created_at, cr.status,
+                    COALESCE(cr.commission_amount, 50.00) as commission_amount,
+                    CASE WHEN cr.status = 'COMPLETED'
+                              AND cr.commission_earned_at IS NOT NULL
+                         THEN 'PAID' ELSE 'PENDING'
+                    END as commission_status,
+                    c.first_name, c.last_name, c.phone
+                FROM customer_referrals cr
+                JOIN customers c ON c.id = cr.referred_customer_id
+                WHERE cr.referrer_customer_id = ?
+                ORDER BY cr.created_at DESC
+            """, (customer_id,))
 
         # Commission structure: $50 per completed referral
         commission_per_referral = 50.00
         total_earned = completed_referrals * commission_per_referral
         pending_earnings = (scheduled_referrals + pending_referrals) * commission_per_referral
 
-        # Get payment history
-        payments = self.db.execute("""
-            SELECT * FROM referral_commission_payments
+        # Total paid out, summed by SQLite
+        paid = self.db.execute("""
+            SELECT COALESCE(SUM(amount), 0) as total_paid, COUNT(*) as count
+            FROM referral_commission_payments
             WHERE customer_id = ?
-            ORDER BY paid_at DESC
         """, (customer_id,))
 
-        total_paid = sum(p['amount'] for p in payments) if payments else 0
+        total_paid = paid[0]['total_paid'] if paid else 0
         balance_due = total_earned - total_paid
 
+        payments = []
+        if detailed and paid and paid[0]['count']:
+            # Get payment history
+            payments = self.db.execute("""
+                SELECT id, referral_id, amount, payment_method, paid_at, notes
+                FROM referral_commission_payments
+                WHERE customer_id = ?
+                ORDER BY paid_at DESC
+            """, (customer_id,))
+
         # Get referral link clicks
         clicks = self.db.execute("""
             SELECT COUNT(*) as count FROM referral_link_clicks
             WHERE referrer_customer_id = ?
         """, (customer_id,))
 
-        referral_link = f"https://portal.pdrcrm.com/refer/{customer_id}"
+        referral_link = _REFER_BASE_URL + str(customer_id)
 
         return {
             'referral_link': referral_link,
@@ -1454,39 +1682,60 @@ class CustomerPortalManager:
                 'commission_rate': commission_per_referral
             },
             'referrals': self._format_referrals(referrals),
-            'payments': list(payments) if payments else []
+            'payments': payments
         }
 
     def get_referral_summary(self, customer_id: int) -> Dict:
         """Get quick referral summary for dashboard"""
         try:
-            dashboard = self.get_referral_dashboard(customer_id)
+            self._ensure_referral_tables()
+
+            counts = self.db.execute("""
+                SELECT
+                    COUNT(*) as total,
+                    COALESCE(SUM(CASE WHEN cr.status = 'COMPLETED' THEN 1 ELSE 0 END), 0) as completed
+                FROM customer_referrals cr
+                JOIN customers c ON c.id = cr.referred_customer_id
+                WHERE cr.referrer_customer_id = ?
+            """, (customer_id,))[0]
+
+            paid = self.db.execute("""
+                SELECT COALESCE(SUM(amount), 0) as total_paid
+                FROM referral_commission_payments
+                WHERE customer_id = ?
+            """, (customer_id,))[0]
+
+            # Same $50 per completed referral as get_referral_dashboard
+            earnings = counts['completed'] * 50.00
             return {
-                'total': dashboard['summary']['total_referrals'],
-                'completed': dashboard['summary']['completed'],
-                'earnings': dashboard['earnings']['total_earned'],
-                'balance': dashboard['earnings']['balance_due']
+                'total': counts['total'],
+                'completed': counts['completed'],
+                'earnings': earnings,
+                'balance': earnings - paid['total_paid']
             }
         except Exception:
             return {'total': 0, 'completed': 0, 'earnings': 0, 'balance': 0}
 
     def _format_referrals(self, referrals: list) -> List[Dict]:
-        """Format referral data for display"""
-        formatted = []
-        for ref in referrals:
-            formatted.append({
+        """Format referral data for display (commission fields come from SQL)"""
+        return [
+            {
                 'id': ref['id'],
                 'name': f"{ref['first_name']} {ref['last_name']}",
-                'phone': ref.get('phone'),
+                'phone': ref['phone'],
                 'referred_date': ref['created_at'],
                 'status': ref['status'],
-                'commission_amount': ref.get('commission_amount', 50.00),
-                'commission_status': 'PAID' if ref['status'] == 'COMPLETED' and ref.get('commission_earned_at') else 'PENDING'
-            })
-        return formatted
+                'commission_amount': ref['commission_amount'],
+                'commission_status': ref['commission_status']
+            }
+            for ref in referrals
+        ]
 
     def _ensure_referral_tables(self):
-        """Ensure referral-related tables exist"""
+        """Ensure referral-related tables exist (once per database per process)"""
+        if self.db.db_path in CustomerPortalManager._referral_schema_ready:
+            return
+
         # Customer referrals table
         self.db.execute("""
             CREATE TABLE IF NOT EXISTS customer_referrals (
@@ -1528,6 +1777,21 @@ class CustomerPortalManager:
             )
         """)
 
+        self.db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_cr_referrer
+            ON customer_referrals(referrer_customer_id, created_at)
+        """)
+        self.db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_rcp_customer
+            ON referral_commission_payments(customer_id, paid_at)
+        """)
+        self.db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_rlc_referrer
+            ON referral_link_clicks(referrer_customer_id)
+        """)
+
+        CustomerPortalManager._referral_schema_ready.add(self.db.db_path)
+
     def track_referral_click(
         self,
         referrer_customer_id: int,
@@ -1538,12 +1802,7 @@ class CustomerPortalManager:
         """Track when someone clicks referral link"""
         self._ensure_referral_tables()
 
-        self.db.execute("""
-            INSERT INTO referral_link_clicks (
-                referrer_customer_id, click_source, clicked_at,
-                ip_address, user_agent
-            ) VALUES (?, ?, ?, ?, ?)
-        """, (
+        self.db.execute(_SQL_INSERT_REFERRAL_CLICK, (
             referrer_customer_id,
             click_source,
             datetime.now().isoformat(),
@@ -1575,7 +1834,10 @@ class CustomerPortalManager:
 
         referral_id = result[0]['id']
 
-        print(f"[OK] Referral created: Customer {referrer_customer_id} referred {referred_customer_id}")
+        logger.info(
+            "Referral %s created: customer %s referred %s",
+            referral_id, referrer_customer_id, referred_customer_id
+        )
 
         return referral_id
 
@@ -1586,49 +1848,48 @@ class CustomerPortalManager:
         notes: Optional[str] = None
     ):
         """Update referral status when job progresses"""
+        now = datetime.now().isoformat()
+
+        if new_status == 'COMPLETED':
+            # Status change and commission earned land in one UPDATE
+            self._process_referral_commission(referral_id, notes, now)
+            return
+
         self.db.execute("""
             UPDATE customer_referrals
             SET status = ?,
                 status_notes = ?,
                 updated_at = ?
             WHERE id = ?
-        """, (
-            new_status,
-            notes,
-            datetime.now().isoformat(),
-            referral_id
-        ))
-
-        # If completed, calculate commission
-        if new_status == 'COMPLETED':
-            self._process_referral_commission(referral_id)
-
-    def _process_referral_commission(self, referral_id: int):
-        """Process commission payment for completed referral"""
-        referral = self.db.execute(
-            "SELECT * FROM customer_referrals WHERE id = ?",
-            (referral_id,)
-        )
-
-        if not referral:
-            return
+        """, (new_status, notes, now, referral_id))
 
-        referral = referral[0]
+    def _process_referral_commission(
+        self,
+        referral_id: int,
+        notes: Optional[str],
+        completed_at: str
+    ):
+        """Mark referral completed and record the commission it earned"""
         commission_amount = 50.00
 
-        # Record commission earned
-        self.db.execute("""
+        result = self.db.execute("""
             UPDATE customer_referrals
-            SET commission_amount = ?,
+            SET status = 'COMPLETED',
+                status_notes = ?,
+                updated_at = ?,
+                commission_amount = ?,
                 commission_earned_at = ?
             WHERE id = ?
         """, (
+            notes,
+            completed_at,
             commission_amount,
-            datetime.now().isoformat(),
+            completed_at,
             referral_id
         ))
 
-        print(f"[OK] Commission of ${commission_amount:.2f} earned for referral {referral_id}")
+        if result[0]['rowcount']:
+            logger.info("Commission of $%.2f earned for referral %s", commission_amount, referral_id)
 
     def pay_referral_commission(
         self,
@@ -1657,6 +1918,6 @@ class CustomerPortalManager:
 
         payment_id = result[0]['id']
 
-        print(f"[OK] Commission payment of ${amount:.2f} recorded for customer {customer_id}")
+        logger.info("Commission payment of $%.2f recorded for customer %s", amount, customer_id)
 
         return payment_id
@@ -12,10 +12,82 @@ FEATURES:
 
 from typing import Optional, List, Dict, Any
 from datetime import datetime, date, timedelta
+from collections import Counter, OrderedDict
 from src.crm.models.database import Database
+import heapq
 import json
+import logging
+import math
+import random
+import re
 import secrets
-import string
+import sqlite3
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+# Customer placeholders filled in by _personalize_html
+_PLACEHOLDER_RE = re.compile(
+    r'\{(CUSTOMER_NAME|CUSTOMER_FULL_NAME|REFERRAL_LINK|BOOKING_LINK|FLYER_URL)\}'
+)
+
+# Flyer template reads are cached for this long, for up to this many keys
+FLYER_CACHE_TTL = 60.0
+FLYER_CACHE_SIZE = 256
+
+
+class _TTLCache:
+    """Small LRU cache whose entries expire FLYER_CACHE_TTL seconds after being set"""
+
+    def __init__(self, maxsize: int = FLYER_CACHE_SIZE, ttl: float = FLYER_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries: OrderedDict = OrderedDict()  # key -> (expires_at, value)
+        self.lock = threading.Lock()
+
+    def get(self, key) -> Any:
+        """Return the cached value, or None if missing or expired"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value: Any):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def discard(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def discard_kind(self, kind: str):
+        """Drop every key of the form (kind, ...)"""
+        with self.lock:
+            for key in [k for k in self.entries if k[0] == kind]:
+                del self.entries[key]
+
+
+# Flyer template cache per database file, shared by every manager instance
+_FLYER_CACHES: Dict[str, _TTLCache] = {}
+_FLYER_CACHES_LOCK = threading.Lock()
+
+
+def _get_flyer_cache(db: Database) -> _TTLCache:
+    with _FLYER_CACHES_LOCK:
+        cache = _FLYER_CACHES.get(db.db_path)
+        if cache is None:
+            cache = _FLYER_CACHES[db.db_path] = _TTLCache()
+        return cache
 
 
 class DigitalFlyerManager:
@@ -32,6 +104,7 @@ class DigitalFlyerManager:
         else:
             self.db = db_path
         self._init_tables()
+        self._cache = _get_flyer_cache(self.db)
 
     def _init_tables(self):
         """Initialize required database tables"""
@@ -60,11 +133,40 @@ class DigitalFlyerManager:
                 flyer_url TEXT UNIQUE,
                 referral_link TEXT,
                 generated_at TEXT,
+                first_name TEXT,
+                last_name TEXT,
+                flyer_name TEXT,
+                flyer_image_url TEXT,
+                cached_html TEXT,
                 FOREIGN KEY (customer_id) REFERENCES customers(id),
                 FOREIGN KEY (flyer_id) REFERENCES digital_flyers(id)
             )
         """)
 
+        # Databases created before the serving copy was denormalized
+        for column in ('first_name', 'last_name', 'flyer_name',
+                       'flyer_image_url', 'cached_html'):
+            try:
+                self.db.execute(
+                    f"ALTER TABLE personalized_flyers ADD COLUMN {column} TEXT"
+                )
+            except sqlite3.OperationalError:
+                pass
+
+        # A renamed customer's personalized flyers are rebuilt on their next
+        # view; the trigger catches renames from any module
+        self.db.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_customers_name_flyer_cache
+            AFTER UPDATE OF first_name, last_name ON customers
+            WHEN OLD.first_name IS NOT NEW.first_name
+              OR OLD.last_name IS NOT NEW.last_name
+            BEGIN
+                UPDATE personalized_flyers
+                SET cached_html = NULL
+                WHERE customer_id = NEW.id;
+            END
+        """)
+
         # Flyer views table
         self.db.execute("""
             CREATE TABLE IF NOT EXISTS flyer_views (
@@ -72,12 +174,65 @@ class DigitalFlyerManager:
                 customer_id INTEGER,
                 flyer_id INTEGER,
                 personalized_flyer_id INTEGER,
+                variant_id INTEGER,
                 viewer_ip TEXT,
                 user_agent TEXT,
                 viewed_at TEXT
             )
         """)
 
+        # Databases created before A/B view attribution lack variant_id
+        try:
+            self.db.execute("ALTER TABLE flyer_views ADD COLUMN variant_id INTEGER")
+        except sqlite3.OperationalError:
+            pass
+
+        # Daily view totals per flyer, kept current by track_flyer_view.
+        # Each rollup's check, create and seed share one write transaction,
+        # so only one of several processes starting together seeds it.
+        with self.db.transaction():
+            rollup_exists = self.db.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'flyer_view_daily'"
+            )
+            self.db.execute("""
+                CREATE TABLE IF NOT EXISTS flyer_view_daily (
+                    flyer_id INTEGER NOT NULL,
+                    view_date TEXT NOT NULL,
+                    views INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (flyer_id, view_date)
+                )
+            """)
+            if not rollup_exists:
+                # Seed the rollup from views recorded before it existed
+                self.db.execute("""
+                    INSERT INTO flyer_view_daily (flyer_id, view_date, views)
+                    SELECT flyer_id, DATE(viewed_at), COUNT(*)
+                    FROM flyer_views
+                    WHERE flyer_id IS NOT NULL AND viewed_at IS NOT NULL
+                    GROUP BY flyer_id, DATE(viewed_at)
+                """)
+
+        # Running view totals per customer, kept current as views are written
+        with self.db.transaction():
+            customer_stats_exist = self.db.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'customer_flyer_stats'"
+            )
+            self.db.execute("""
+                CREATE TABLE IF NOT EXISTS customer_flyer_stats (
+                    customer_id INTEGER PRIMARY KEY,
+                    total_views INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            if not customer_stats_exist:
+                # Seed from views recorded before the counter existed
+                self.db.execute("""
+                    INSERT INTO customer_flyer_stats (customer_id, total_views)
+                    SELECT customer_id, COUNT(*)
+                    FROM flyer_views
+                    WHERE customer_id IS NOT NULL
+                    GROUP BY customer_id
+                """)
+
         # Flyer campaigns table
         self.db.execute("""
             CREATE TABLE IF NOT EXISTS flyer_campaigns (
@@ -106,6 +261,75 @@ class DigitalFlyerManager:
             )
         """)
 
+        # Running view totals per campaign, kept current as views are written;
+        # flyer_campaign_viewers holds the distinct viewer IPs behind unique_viewers
+        with self.db.transaction():
+            stats_exist = self.db.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'flyer_campaign_stats'"
+            )
+            self.db.execute("""
+                CREATE TABLE IF NOT EXISTS flyer_campaign_stats (
+                    campaign_id INTEGER PRIMARY KEY,
+                    total_views INTEGER NOT NULL DEFAULT 0,
+                    unique_viewers INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            self.db.execute("""
+                CREATE TABLE IF NOT EXISTS flyer_campaign_viewers (
+                    campaign_id INTEGER NOT NULL,
+                    viewer_ip TEXT NOT NULL,
+                    PRIMARY KEY (campaign_id, viewer_ip)
+                ) WITHOUT ROWID
+            """)
+            if not stats_exist:
+                # Seed from views recorded before the rollup existed
+                self.db.execute("""
+                    INSERT OR IGNORE INTO flyer_campaign_viewers (campaign_id, viewer_ip)
+                    SELECT DISTINCT df.campaign_id, fv.viewer_ip
+                    FROM flyer_views fv
+                    JOIN digital_flyers df ON df.id = fv.flyer_id
+                    WHERE df.campaign_id IS NOT NULL AND fv.viewer_ip IS NOT NULL
+                """)
+                self.db.execute("""
+                    INSERT INTO flyer_campaign_stats (campaign_id, total_views, unique_viewers)
+                    SELECT df.campaign_id, COUNT(*), COUNT(DISTINCT fv.viewer_ip)
+                    FROM flyer_views fv
+                    JOIN digital_flyers df ON df.id = fv.flyer_id
+                    WHERE df.campaign_id IS NOT NULL
+                    GROUP BY df.campaign_id
+                """)
+
+        # Indexes for view tracking and analytics lookups
+        # (personalized_flyers.flyer_url is already indexed by its UNIQUE constraint)
+        self.db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_flyer_views_customer
+            ON flyer_views(customer_id)
+        """)
+        self.db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_flyer_views_flyer_date
+            ON flyer_views(flyer_id, viewed_at)
+        """)
+        self.db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_flyer_views_pf
+            ON flyer_views(personalized_flyer_id)
+        """)
+        self.db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_flyer_views_variant
+            ON flyer_views(variant_id)
+        """)
+        self.db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_pf_customer
+            ON personalized_flyers(customer_id, generated_at)
+        """)
+        self.db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_df_status_type
+            ON digital_flyers(status, flyer_type, created_at DESC)
+        """)
+        self.db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_df_campaign
+            ON digital_flyers(campaign_id)
+        """)
+
     # ========================================================================
     # FLYER MANAGEMENT
     # ========================================================================
@@ -136,6 +360,7 @@ class DigitalFlyerManager:
                 flyer_name, flyer_html, flyer_image_url,
                 flyer_type, campaign_id, created_at, status
             ) VALUES (?, ?, ?, ?, ?, ?, ?)
+            RETURNING id
         """, (
             flyer_name,
             flyer_html,
@@ -147,29 +372,39 @@ class DigitalFlyerManager:
         ))
 
         flyer_id = result[0]['id']
+        self._invalidate_flyer()
 
-        print(f"Digital Flyer Uploaded")
-        print(f"   ID: {flyer_id}")
-        print(f"   Name: {flyer_name}")
-        print(f"   Type: {flyer_type}")
+        logger.debug("Digital flyer uploaded id=%s name=%s type=%s",
+                     flyer_id, flyer_name, flyer_type)
 
         return flyer_id
 
     def get_flyer(self, flyer_id: int) -> Optional[Dict]:
-        """Get flyer by ID"""
+        """Get flyer by ID (cached for FLYER_CACHE_TTL seconds)"""
 
-        result = self.db.execute(
-            "SELECT * FROM digital_flyers WHERE id = ?",
-            (flyer_id,)
-        )
+        flyer = self._cache.get(('flyer', flyer_id))
+        if flyer is None:
+            result = self.db.execute(
+                "SELECT * FROM digital_flyers WHERE id = ?",
+                (flyer_id,)
+            )
+            if not result:
+                return None
+            flyer = result[0]
+            self._cache.set(('flyer', flyer_id), flyer)
 
-        return dict(result[0]) if result else None
+        # Callers get their own copy; the cached row stays untouched
+        return dict(flyer)
 
     def get_active_flyers(
         self,
         flyer_type: Optional[str] = None
     ) -> List[Dict]:
-        """Get all active flyers"""
+        """Get all active flyers (cached for FLYER_CACHE_TTL seconds)"""
+
+        results = self._cache.get(('active', flyer_type))
+        if results is not None:
+            return [dict(r) for r in results]
 
         if flyer_type:
             results = self.db.execute("""
@@ -184,6 +419,8 @@ class DigitalFlyerManager:
                 ORDER BY created_at DESC
             """)
 
+        self._cache.set(('active', flyer_type), results)
+
         return [dict(r) for r in results]
 
     def update_flyer(
@@ -195,30 +432,33 @@ class DigitalFlyerManager:
     ):
         """Update flyer content"""
 
-        updates = []
-        params = []
-
-        if flyer_html:
-            updates.append("flyer_html = ?")
-            params.append(flyer_html)
-
-        if flyer_image_url:
-            updates.append("flyer_image_url = ?")
-            params.append(flyer_image_url)
-
-        if status:
-            updates.append("status = ?")
-            params.append(status)
-
-        updates.append("updated_at = ?")
-        params.append(datetime.now().isoformat())
-        params.append(flyer_id)
-
-        self.db.execute(f"""
-            UPDATE digital_flyers
-            SET {', '.join(updates)}
-            WHERE id = ?
-        """, tuple(params))
+        # One fixed statement for every call; empty or None keeps the
+        # current value
+        with self.db.transaction():
+            self.db.execute("""
+                UPDATE digital_flyers
+                SET flyer_html = COALESCE(?, flyer_html),
+                    flyer_image_url = COALESCE(?, flyer_image_url),
+                    status = COALESCE(?, status),
+                    updated_at = ?
+                WHERE id = ?
+            """, (
+                flyer_html or None,
+                flyer_image_url or None,
+                status or None,
+                datetime.now().isoformat(),
+                flyer_id
+            ))
+
+            if flyer_html or flyer_image_url:
+                # Personalized copies are rebuilt on their next view
+                self.db.execute("""
+                    UPDATE personalized_flyers
+                    SET cached_html = NULL
+                    WHERE flyer_id = ?
+                """, (flyer_id,))
+
+        self._invalidate_flyer(flyer_id)
 
     def delete_flyer(self, flyer_id: int):
         """Soft delete flyer"""
@@ -229,6 +469,14 @@ class DigitalFlyerManager:
             WHERE id = ?
         """, (datetime.now().isoformat(), flyer_id))
 
+        self._invalidate_flyer(flyer_id)
+
+    def _invalidate_flyer(self, flyer_id: Optional[int] = None):
+        """Drop cached reads a flyer write may have changed"""
+        if flyer_id is not None:
+            self._cache.discard(('flyer', flyer_id))
+        self._cache.discard_kind('active')
+
     # ========================================================================
     # PERSONALIZED FLYERS
     # ========================================================================
@@ -244,73 +492,78 @@ class DigitalFlyerManager:
         Includes customer's unique referral link
         """
 
-        customer = self.db.execute(
-            "SELECT * FROM customers WHERE id = ?",
-            (customer_id,)
-        )
+        now = datetime.now().isoformat()
 
-        if not customer:
-            raise ValueError(f"Customer {customer_id} not found")
+        # Reads and the insert share one write transaction
+        with self.db.transaction():
+            customer = self.db.execute(
+                "SELECT first_name, last_name FROM customers WHERE id = ?",
+                (customer_id,)
+            )
 
-        customer = customer[0]
+            if not customer:
+                raise ValueError(f"Customer {customer_id} not found")
 
-        flyer = self.db.execute(
-            "SELECT * FROM digital_flyers WHERE id = ?",
-            (flyer_id,)
-        )
+            customer = customer[0]
 
-        if not flyer:
-            raise ValueError(f"Flyer {flyer_id} not found")
-
-        flyer = flyer[0]
-
-        # Generate unique referral link
-        referral_link = f"https://portal.pdrcrm.com/refer/{customer_id}"
-        booking_link = f"https://portal.pdrcrm.com/book?ref={customer_id}"
-
-        # Generate unique flyer URL
-        flyer_token = ''.join(secrets.choice(string.ascii_lowercase + string.digits) for _ in range(12))
-        flyer_url = f"https://flyers.pdrcrm.com/{flyer_token}"
-
-        # Personalize flyer HTML
-        personalized_html = flyer['flyer_html']
-        if personalized_html:
-            personalized_html = personalized_html.replace(
-                '{CUSTOMER_NAME}', customer['first_name']
-            ).replace(
-                '{CUSTOMER_FULL_NAME}', f"{customer['first_name']} {customer['last_name']}"
-            ).replace(
-                '{REFERRAL_LINK}', referral_link
-            ).replace(
-                '{BOOKING_LINK}', booking_link
-            ).replace(
-                '{FLYER_URL}', flyer_url
+            flyer = self.db.execute(
+                "SELECT flyer_name, flyer_html, flyer_image_url FROM digital_flyers WHERE id = ?",
+                (flyer_id,)
             )
 
-        # Track flyer generation
-        self.db.execute("""
-            INSERT INTO personalized_flyers (
-                customer_id, flyer_id, flyer_url,
-                referral_link, generated_at
-            ) VALUES (?, ?, ?, ?, ?)
-        """, (
-            customer_id,
-            flyer_id,
-            flyer_url,
-            referral_link,
-            datetime.now().isoformat()
-        ))
+            if not flyer:
+                raise ValueError(f"Flyer {flyer_id} not found")
+
+            flyer = flyer[0]
+
+            # Generate unique referral link
+            referral_link = f"https://portal.pdrcrm.com/refer/{customer_id}"
+            booking_link = f"https://portal.pdrcrm.com/book?ref={customer_id}"
+
+            # Generate unique flyer URL
+            flyer_token = secrets.token_urlsafe(9)  # 12 URL-safe chars from one urandom read
+            flyer_url = f"https://flyers.pdrcrm.com/{flyer_token}"
+
+            # Personalize flyer HTML
+            personalized_html = self._personalize_html(
+                flyer['flyer_html'],
+                customer['first_name'],
+                customer['last_name'],
+                referral_link,
+                booking_link,
+                flyer_url
+            )
 
-        print(f"Personalized Flyer Generated")
-        print(f"   Customer: {customer['first_name']} {customer['last_name']}")
-        print(f"   Flyer URL: {flyer_url}")
+            # Track flyer generation, with a ready-to-serve copy for page views
+            self.db.execute("""
+                INSERT INTO personalized_flyers (
+                    customer_id, flyer_id, flyer_url,
+                    referral_link, generated_at,
+                    first_name, last_name, flyer_name,
+                    flyer_image_url, cached_html
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                customer_id,
+                flyer_id,
+                flyer_url,
+                referral_link,
+                now,
+                customer['first_name'],
+                customer['last_name'],
+                flyer['flyer_name'],
+                flyer['flyer_image_url'],
+                personalized_html or ''  # '' marks "cached, no HTML"; NULL means rebuild
+            ))
+
+        logger.debug("Personalized flyer generated customer_id=%s url=%s",
+                     customer_id, flyer_url)
 
         return {
             'flyer_url': flyer_url,
             'referral_link': referral_link,
             'booking_link': booking_link,
             'flyer_html': personalized_html,
-            'flyer_image_url': flyer.get('flyer_image_url'),
+            'flyer_image_url': flyer['flyer_image_url'],
             'customer_name': customer['first_name']
         }
 
@@ -320,8 +573,69 @@ class DigitalFlyerManager:
     ) -> Optional[Dict]:
         """Get personalized flyer by URL"""
 
+        # Served from the copy stored at generation time; no joins
+        result = self.db.execute("""
+            SELECT id, customer_id, flyer_id, flyer_url, referral_link,
+                   generated_at, cached_html as flyer_html, flyer_image_url,
+                   flyer_name, first_name, last_name
+            FROM personalized_flyers
+            WHERE flyer_url = ?
+        """, (flyer_url,))
+
+        if not result:
+            return None
+
+        data = result[0]
+        if data['flyer_html'] is None:
+            # Older row, or the flyer changed since generation
+            return self._refresh_personalized_flyer(flyer_url)
+
+        return data
+
+    def fetch_and_track(
+        self,
+        flyer_url: str,
+        viewer_ip: Optional[str] = None,
+        user_agent: Optional[str] = None
+    ) -> Optional[Dict]:
+        """
+        Get a personalized flyer by URL and record the page view
+
+        The view is inserted straight from the personalized_flyers row
+        (INSERT ... SELECT) and the page is read back in the same write
+        transaction, so serving a page costs one commit.
+
+        Returns:
+            The personalized flyer, or None if the URL is unknown
+        """
+
+        with self.db.transaction():
+            viewed = self.db.execute("""
+                INSERT INTO flyer_views (
+                    customer_id, flyer_id, personalized_flyer_id,
+                    viewer_ip, user_agent, viewed_at
+                )
+                SELECT customer_id, flyer_id, id, ?, ?, ?
+                FROM personalized_flyers
+                WHERE flyer_url = ?
+                RETURNING customer_id, flyer_id, personalized_flyer_id,
+                          variant_id, viewer_ip, user_agent, viewed_at
+            """, (viewer_ip, user_agent, datetime.now().isoformat(), flyer_url))
+
+            if not viewed:
+                return None
+
+            self._update_view_rollups([tuple(row.values()) for row in viewed])
+
+            return self.get_personalized_flyer(flyer_url)
+
+    def _refresh_personalized_flyer(self, flyer_url: str) -> Optional[Dict]:
+        """Rebuild and store the serving copy of a personalized flyer"""
+
         result = self.db.execute("""
-            SELECT pf.*, df.flyer_html, df.flyer_image_url, df.flyer_name,
+            SELECT pf.id, pf.customer_id, pf.flyer_id, pf.flyer_url,
+                   pf.referral_link, pf.generated_at,
+                   df.flyer_html, df.flyer_image_url, df.flyer_name,
                    c.first_name, c.last_name
             FROM personalized_flyers pf
             JOIN digital_flyers df ON df.id = pf.flyer_id
@@ -332,18 +646,55 @@ class DigitalFlyerManager:
         if not result:
             return None
 
-        data = dict(result[0])
+        data = result[0]
+        data['flyer_html'] = self._personalize_html(
+            data['flyer_html'],
+            data['first_name'],
+            data['last_name'],
+            data['referral_link'],
+            f"https://portal.pdrcrm.com/book?ref={data['customer_id']}",
+            data['flyer_url']
+        )
 
-        # Personalize on retrieval
-        if data.get('flyer_html'):
-            data['flyer_html'] = data['flyer_html'].replace(
-                '{CUSTOMER_NAME}', data['first_name']
-            ).replace(
-                '{REFERRAL_LINK}', data['referral_link']
-            )
+        self.db.execute("""
+            UPDATE personalized_flyers
+            SET first_name = ?, last_name = ?, flyer_name = ?,
+                flyer_image_url = ?, cached_html = ?
+            WHERE id = ?
+        """, (
+            data['first_name'],
+            data['last_name'],
+            data['flyer_name'],
+            data['flyer_image_url'],
+            data['flyer_html'] or '',
+            data['id']
+        ))
 
         return data
 
+    @staticmethod
+    def _personalize_html(
+        html: Optional[str],
+        first_name: str,
+        last_name: str,
+        referral_link: str,
+        booking_link: str,
+        flyer_url: str
+    ) -> Optional[str]:
+        """Fill the customer placeholders in flyer HTML (single pass)"""
+        if not html:
+            return html
+
+        values = {
+            'CUSTOMER_NAME': first_name,
+            'CUSTOMER_FULL_NAME': f"{first_name} {last_name}",
+            'REFERRAL_LINK': referral_link,
+            'BOOKING_LINK': booking_link,
+            'FLYER_URL': flyer_url
+        }
+
+        return _PLACEHOLDER_RE.sub(lambda match: values[match.group(1)], html)
+
     def get_customer_flyers(
         self,
         customer_id: int
@@ -358,7 +709,7 @@ class DigitalFlyerManager:
             ORDER BY pf.generated_at DESC
         """, (customer_id,))
 
-        return [dict(r) for r in results]
+        return results
 
     # ========================================================================
     # VIEW TRACKING
@@ -370,23 +721,110 @@ class DigitalFlyerManager:
         flyer_id: int,
         viewer_ip: Optional[str] = None,
         user_agent: Optional[str] = None,
-        personalized_flyer_id: Optional[int] = None
+        personalized_flyer_id: Optional[int] = None,
+        variant_id: Optional[int] = None
     ):
-        """Track when someone views the flyer"""
+        """
+        Track when someone views the flyer
 
-        self.db.execute("""
+        The view and the rollups it feeds are written in one transaction
+        before returning. Pass variant_id when the view was served an A/B
+        variant (see get_ab_variant) so get_ab_test_results can attribute it.
+        """
+
+        with self.db.transaction():
+            self._write_views([(
+                customer_id,
+                flyer_id,
+                personalized_flyer_id,
+                variant_id,
+                viewer_ip,
+                user_agent,
+                datetime.now().isoformat()
+            )])
+
+    def _write_views(self, rows: List[tuple]):
+        """Insert flyer_views rows and bump the rollups they touch (call inside a transaction)"""
+        self.db.execute_many("""
             INSERT INTO flyer_views (
                 customer_id, flyer_id, personalized_flyer_id,
-                viewer_ip, user_agent, viewed_at
-            ) VALUES (?, ?, ?, ?, ?, ?)
-        """, (
-            customer_id,
-            flyer_id,
-            personalized_flyer_id,
-            viewer_ip,
-            user_agent,
-            datetime.now().isoformat()
-        ))
+                variant_id, viewer_ip, user_agent, viewed_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+
+        self._update_view_rollups(rows)
+
+    def _update_view_rollups(self, rows: List[tuple]):
+        """
+        Add flyer_views rows to the rollup tables (call inside a transaction)
+
+        Rows are (customer_id, flyer_id, personalized_flyer_id, variant_id,
+        viewer_ip, user_agent, viewed_at), as stored in flyer_views.
+        """
+        # Per-customer totals for get_flyer_analytics
+        per_customer = Counter(row[0] for row in rows if row[0] is not None)
+        if per_customer:
+            self.db.execute_many("""
+                INSERT INTO customer_flyer_stats (customer_id, total_views)
+                VALUES (?, ?)
+                ON CONFLICT (customer_id)
+                DO UPDATE SET total_views = total_views + excluded.total_views
+            """, list(per_customer.items()))
+
+        # viewed_at is ISO formatted, so its first 10 chars are DATE(viewed_at)
+        daily = Counter(
+            (row[1], row[6][:10]) for row in rows if row[1] is not None
+        )
+        if not daily:
+            return
+
+        self.db.execute_many("""
+            INSERT INTO flyer_view_daily (flyer_id, view_date, views)
+            VALUES (?, ?, ?)
+            ON CONFLICT (flyer_id, view_date)
+            DO UPDATE SET views = views + excluded.views
+        """, [(flyer_id, view_date, views)
+              for (flyer_id, view_date), views in daily.items()])
+
+        # Campaign totals, for flyers that belong to a campaign
+        flyer_ids = list({flyer_id for flyer_id, _ in daily})
+        placeholders = ','.join('?' * len(flyer_ids))
+        campaign_of = {
+            row['id']: row['campaign_id']
+            for row in self.db.execute(f"""
+                SELECT id, campaign_id FROM digital_flyers
+                WHERE id IN ({placeholders}) AND campaign_id IS NOT NULL
+            """, tuple(flyer_ids))
+        }
+        if not campaign_of:
+            return
+
+        views = Counter()
+        viewers: Dict[int, set] = {}
+        for row in rows:
+            campaign_id = campaign_of.get(row[1])
+            if campaign_id is None:
+                continue
+            views[campaign_id] += 1
+            if row[4] is not None:
+                viewers.setdefault(campaign_id, set()).add(row[4])
+
+        for campaign_id, count in views.items():
+            # Viewers seen for the first time are the ones actually inserted
+            new_viewers = 0
+            if campaign_id in viewers:
+                new_viewers = self.db.execute_many("""
+                    INSERT OR IGNORE INTO flyer_campaign_viewers (campaign_id, viewer_ip)
+                    VALUES (?, ?)
+                """, [(campaign_id, ip) for ip in viewers[campaign_id]])
+
+            self.db.execute("""
+                INSERT INTO flyer_campaign_stats (campaign_id, total_views, unique_viewers)
+                VALUES (?, ?, ?)
+                ON CONFLICT (campaign_id) DO UPDATE SET
+                    total_views = total_views + excluded.total_views,
+                    unique_viewers = unique_viewers + excluded.unique_viewers
+            """, (campaign_id, count, new_viewers))
 
     def get_flyer_analytics(
         self,
@@ -394,30 +832,21 @@ class DigitalFlyerManager:
     ) -> Dict:
         """Get analytics for customer's shared flyers"""
 
-        # Get total views
-        views = self.db.execute("""
-            SELECT COUNT(*) as view_count
-            FROM flyer_views
-            WHERE customer_id = ?
-        """, (customer_id,))
-
-        # Get referral link clicks (from portal manager tables)
-        clicks = self.db.execute("""
-            SELECT COUNT(*) as click_count
-            FROM referral_link_clicks
-            WHERE referrer_customer_id = ?
-        """, (customer_id,))
-
-        # Get referrals generated
-        referrals = self.db.execute("""
-            SELECT COUNT(*) as referral_count
-            FROM customer_referrals
-            WHERE referrer_customer_id = ?
-        """, (customer_id,))
-
-        total_views = views[0]['view_count'] if views else 0
-        total_clicks = clicks[0]['click_count'] if clicks else 0
-        total_referrals = referrals[0]['referral_count'] if referrals else 0
+        # Stored view total, referral link clicks (portal manager tables)
+        # and referrals generated, read in a single statement
+        counts = self.db.execute("""
+            SELECT
+                (SELECT COALESCE(SUM(total_views), 0) FROM customer_flyer_stats
+                 WHERE customer_id = ?) as view_count,
+                (SELECT COUNT(*) FROM referral_link_clicks
+                 WHERE referrer_customer_id = ?) as click_count,
+                (SELECT COUNT(*) FROM customer_referrals
+                 WHERE referrer_customer_id = ?) as referral_count
+        """, (customer_id,) * 3)[0]
+
+        total_views = counts['view_count']
+        total_clicks = counts['click_count']
+        total_referrals = counts['referral_count']
 
         # Calculate conversion rates
         click_rate = (total_clicks / total_views * 100) if total_views > 0 else 0
@@ -438,18 +867,16 @@ class DigitalFlyerManager:
     ) -> List[Dict]:
         """Get view history for a flyer"""
 
-        cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
+        cutoff_date = (date.today() - timedelta(days=days)).isoformat()
 
-        results = self.db.execute("""
-            SELECT DATE(viewed_at) as view_date, COUNT(*) as views
-            FROM flyer_views
-            WHERE flyer_id = ? AND viewed_at >= ?
-            GROUP BY DATE(viewed_at)
+        # Range scan over the daily rollup instead of re-aggregating raw views
+        return self.db.execute("""
+            SELECT view_date, views
+            FROM flyer_view_daily
+            WHERE flyer_id = ? AND view_date >= ?
             ORDER BY view_date
         """, (flyer_id, cutoff_date))
 
-        return [dict(r) for r in results]
-
     # ========================================================================
     # CAMPAIGNS
     # ========================================================================
@@ -469,6 +896,7 @@ class DigitalFlyerManager:
                 campaign_name, campaign_type, start_date,
                 end_date, target_audience, created_at, status
             ) VALUES (?, ?, ?, ?, ?, ?, ?)
+            RETURNING id
         """, (
             campaign_name,
             campaign_type,
@@ -481,9 +909,8 @@ class DigitalFlyerManager:
 
         campaign_id = result[0]['id']
 
-        print(f"Campaign Created")
-        print(f"   ID: {campaign_id}")
-        print(f"   Name: {campaign_name}")
+        logger.debug("Flyer campaign created id=%s name=%s",
+                     campaign_id, campaign_name)
 
         return campaign_id
 
@@ -493,15 +920,17 @@ class DigitalFlyerManager:
     ) -> Dict:
         """Get analytics for a campaign"""
 
-        # Get all flyers in campaign
-        flyers = self.db.execute("""
-            SELECT * FROM digital_flyers
-            WHERE campaign_id = ?
-        """, (campaign_id,))
-
-        flyer_ids = [f['id'] for f in flyers]
-
-        if not flyer_ids:
+        # Flyer count plus the running totals kept by the view writer
+        stats = self.db.execute("""
+            SELECT
+                (SELECT COUNT(*) FROM digital_flyers WHERE campaign_id = ?) as flyers,
+                COALESCE(s.total_views, 0) as total_views,
+                COALESCE(s.unique_viewers, 0) as unique_viewers
+            FROM (SELECT 1)
+            LEFT JOIN flyer_campaign_stats s ON s.campaign_id = ?
+        """, (campaign_id, campaign_id))[0]
+
+        if not stats['flyers']:
             return {
                 'campaign_id': campaign_id,
                 'flyers': 0,
@@ -509,21 +938,11 @@ class DigitalFlyerManager:
                 'unique_viewers': 0
             }
 
-        # Get view statistics
-        placeholders = ','.join('?' * len(flyer_ids))
-
-        views = self.db.execute(f"""
-            SELECT COUNT(*) as total_views,
-                   COUNT(DISTINCT viewer_ip) as unique_viewers
-            FROM flyer_views
-            WHERE flyer_id IN ({placeholders})
-        """, tuple(flyer_ids))
-
         return {
             'campaign_id': campaign_id,
-            'flyers': len(flyers),
-            'total_views': views[0]['total_views'] if views else 0,
-            'unique_viewers': views[0]['unique_viewers'] if views else 0
+            'flyers': stats['flyers'],
+            'total_views': stats['total_views'],
+            'unique_viewers': stats['unique_viewers']
         }
 
     # ========================================================================
@@ -545,6 +964,7 @@ class DigitalFlyerManager:
                 flyer_id, variant_name, variant_html,
                 variant_image_url, weight, created_at
             ) VALUES (?, ?, ?, ?, ?, ?)
+            RETURNING id
         """, (
             flyer_id,
             variant_name,
@@ -556,37 +976,85 @@ class DigitalFlyerManager:
 
         variant_id = result[0]['id']
 
-        print(f"A/B Variant Created")
-        print(f"   Flyer ID: {flyer_id}")
-        print(f"   Variant: {variant_name}")
-        print(f"   Weight: {weight}%")
+        logger.debug("A/B variant created flyer_id=%s variant=%s weight=%s",
+                     flyer_id, variant_name, weight)
 
         return variant_id
 
     def get_ab_variant(self, flyer_id: int) -> Optional[Dict]:
-        """Get a random A/B variant based on weights"""
+        """
+        Get a random A/B variant based on weights
+
+        The weighted draw runs in SQLite: one random point in [0, total
+        weight) picks the first variant whose running weight exceeds it,
+        and only that row is returned. None if the flyer has no variant
+        with a positive weight.
+        """
+
+        result = self.db.execute("""
+            WITH weighted AS (
+                SELECT id, flyer_id, variant_name, variant_html,
+                       variant_image_url, weight, created_at,
+                       SUM(weight) OVER (ORDER BY id) as running_weight,
+                       SUM(weight) OVER () as total_weight
+                FROM flyer_ab_variants
+                WHERE flyer_id = ? AND weight > 0
+            ),
+            pick AS (
+                SELECT (RANDOM() % total_weight + total_weight) % total_weight as point
+                FROM weighted
+                LIMIT 1
+            )
+            SELECT id, flyer_id, variant_name, variant_html,
+                   variant_image_url, weight, created_at
+            FROM weighted, pick
+            WHERE running_weight > pick.point
+            ORDER BY running_weight
+            LIMIT 1
+        """, (flyer_id,))
+
+        return result[0] if result else None
+
+    def get_ab_variants(self, flyer_id: int, k: int) -> List[Dict]:
+        """
+        Draw k distinct A/B variants, each pick weighted by variant weight
 
-        import random
+        For multi-arm rollouts that show several variants at once.
+
+        Args:
+            flyer_id: Flyer ID
+            k: Number of variants to draw
+
+        Returns:
+            Up to k variants in draw order
+        """
 
         variants = self.db.execute("""
-            SELECT * FROM flyer_ab_variants
-            WHERE flyer_id = ?
+            SELECT id, flyer_id, variant_name, variant_html,
+                   variant_image_url, weight, created_at
+            FROM flyer_ab_variants
+            WHERE flyer_id = ? AND weight > 0
         """, (flyer_id,))
 
-        if not variants:
-            return None
+        return self._weighted_sample_without_replacement(variants, k)
 
-        # Weight-based selection
-        total_weight = sum(v['weight'] for v in variants)
-        random_value = random.randint(1, total_weight)
+    @staticmethod
+    def _weighted_sample_without_replacement(rows: List[Dict], k: int) -> List[Dict]:
+        """
+        Weighted sample of k rows without replacement (Efraimidis-Spirakis)
 
-        cumulative = 0
-        for variant in variants:
-            cumulative += variant['weight']
-            if random_value <= cumulative:
-                return dict(variant)
+        Each row gets the key -ln(u) / weight with u uniform in (0, 1] and
+        the k smallest keys win: one pass over the rows plus an O(k) heap.
+        The log form avoids the underflow of u ** (1 / weight) for large
+        weights. Rows must have a positive 'weight'.
+        """
+        if k <= 0:
+            return []
 
-        return dict(variants[0])
+        return heapq.nsmallest(
+            k, rows,
+            key=lambda row: -math.log(1.0 - random.random()) / row['weight']
+        )
 
     def get_ab_test_results(
         self,
@@ -594,34 +1062,29 @@ class DigitalFlyerManager:
     ) -> Dict:
         """Get A/B test results for a flyer"""
 
+        # Views attributed to each variant, counted in one grouped query
         variants = self.db.execute("""
-            SELECT * FROM flyer_ab_variants
-            WHERE flyer_id = ?
+            SELECT v.id, v.variant_name, v.weight, COUNT(fv.id) as views
+            FROM flyer_ab_variants v
+            LEFT JOIN flyer_views fv ON fv.variant_id = v.id
+            WHERE v.flyer_id = ?
+            GROUP BY v.id
+            ORDER BY v.id
         """, (flyer_id,))
 
-        results = {
+        return {
             'flyer_id': flyer_id,
-            'variants': []
+            'variants': [
+                {
+                    'variant_id': variant['id'],
+                    'variant_name': variant['variant_name'],
+                    'weight': variant['weight'],
+                    'views': variant['views']
+                }
+                for variant in variants
+            ]
         }
 
-        for variant in variants:
-            # Get views for this variant
-            views = self.db.execute("""
-                SELECT COUNT(*) as views
-                FROM flyer_views fv
-                JOIN personalized_flyers pf ON pf.id = fv.personalized_flyer_id
-                WHERE pf.flyer_id = ?
-            """, (flyer_id,))
-
-            results['variants'].append({
-                'variant_id': variant['id'],
-                'variant_name': variant['variant_name'],
-                'weight': variant['weight'],
-                'views': views[0]['views'] if views else 0
-            })
-
-        return results
-
     # ========================================================================
     # FLYER TEMPLATES
     # ========================================================================
@@ -629,7 +1092,20 @@ class DigitalFlyerManager:
     def get_default_flyer_template(self) -> str:
         """Get default flyer HTML template"""
 
-        return """
+        return _DEFAULT_TEMPLATE
+
+    def create_default_flyer(self) -> int:
+        """Create a default flyer using the template"""
+
+        return self.upload_company_flyer(
+            flyer_name='Default Referral Flyer',
+            flyer_html=self.get_default_flyer_template(),
+            flyer_type='STANDARD'
+        )
+
+
+# Default referral flyer HTML, stripped once at import
+_DEFAULT_TEMPLATE = """
 <!DOCTYPE html>
 <html>
 <head>
@@ -762,12 +1238,3 @@ class DigitalFlyerManager:
 </body>
 </html>
         """.strip()
-
-    def create_default_flyer(self) -> int:
-        """Create a default flyer using the template"""
-
-        return self.upload_company_flyer(
-            flyer_name='Default Referral Flyer',
-            flyer_html=self.get_default_flyer_template(),
-            flyer_type='STANDARD'
-        )
@@ -11,11 +11,521 @@ FEATURES:
 - Gamification
 """
 
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any, Iterator, Tuple, Union
 from datetime import datetime, date, timedelta
-from src.crm.models.database import Database
+from collections import OrderedDict
+from functools import lru_cache
+from src.crm.models.database import Database, TRANSACTION_PRAGMAS
 import json
+import logging
 import math
+import sqlite3
+import threading
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # optional - faster JSON encoding when installed
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+def _json_dumps(value: Any) -> str:
+    """
+    Encode value as compact JSON, using orjson when available
+
+    Strings (and bytes) are taken to be JSON already and passed through.
+    """
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bytes):
+        return value.decode()
+    if orjson is not None:
+        return orjson.dumps(value).decode()
+    return json.dumps(value, separators=(',', ':'))  # same output as orjson
+
+
+# Mean earth radius, for great-circle do-not-knock checks
+EARTH_RADIUS_FEET = 20_902_000.0
+
+# Competitor hotspots: grid cell size (~0.7 miles) and the sightings a
+# cell needs within the heatmap period to count as a hotspot
+HOTSPOT_CELL_DEGREES = 0.01
+HOTSPOT_MIN_SIGHTINGS = 3
+
+# Property enrichment lookups: how many addresses to keep in memory, and
+# how long a stored lookup stays valid before the provider is asked again
+ENRICHMENT_CACHE_SIZE = 10000
+ENRICHMENT_MAX_AGE_DAYS = 90
+
+# Route stop layouts (coordinates + distance matrix) kept between calls
+ROUTE_CACHE_SIZE = 128
+
+# Achievement badges by achievement_type; other types use _DEFAULT_BADGE
+_BADGES = {
+    'FIRST_LEAD': {'emoji': 'Target', 'name': 'First Blood', 'points': 10},
+    'LEAD_STREAK_5': {'emoji': 'Fire', 'name': 'On Fire', 'points': 50},
+    'DAILY_TEN': {'emoji': '100', 'name': 'Perfect Ten', 'points': 100},
+    'PERFECT_WEEK': {'emoji': 'Crown', 'name': 'Weekly King', 'points': 250},
+    'CLOSER': {'emoji': 'Medal', 'name': 'The Closer', 'points': 500},
+    'SPEED_DEMON': {'emoji': 'Lightning', 'name': 'Speed Demon', 'points': 150}
+}
+_DEFAULT_BADGE = {'emoji': 'Trophy', 'name': 'Achievement', 'points': 10}
+
+# Leaderboard badges for the top ranks, best first
+_LEADERBOARD_BADGES = ('Gold', 'Silver', 'Bronze')
+
+# Total points for a salesperson, summed in SQL from the _BADGES values
+_SQL_SALESPERSON_POINTS = """
+    SELECT COALESCE(SUM(CASE achievement_type
+        {cases}
+        ELSE {default}
+    END), 0) as points
+    FROM achievements
+    WHERE salesperson_id = ?
+""".format(
+    cases='\n        '.join(
+        f"WHEN '{achievement_type}' THEN {badge['points']}"
+        for achievement_type, badge in _BADGES.items()
+    ),
+    default=_DEFAULT_BADGE['points']
+)
+
+# Bump when _SCHEMA_SQL or the migrations in _ensure_tables_exist change;
+# stored in elite_sales_schema so setup runs once per database file
+_SCHEMA_VERSION = 5
+
+# Elite sales tables and indexes (all IF NOT EXISTS, safe to re-run)
+_SCHEMA_SQL = """
+    -- Salespeople table
+    CREATE TABLE IF NOT EXISTS salespeople (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        first_name TEXT NOT NULL,
+        last_name TEXT NOT NULL,
+        email TEXT,
+        phone TEXT,
+        employee_id TEXT UNIQUE,
+        status TEXT DEFAULT 'ACTIVE',
+        hire_date DATE,
+        commission_rate REAL DEFAULT 0.15,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- Sales grid cells for territory management
+    CREATE TABLE IF NOT EXISTS sales_grid_cells (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        swath_id INTEGER,
+        cell_index INTEGER,
+        center_lat REAL NOT NULL,
+        center_lon REAL NOT NULL,
+        status TEXT DEFAULT 'UNASSIGNED',
+        assigned_to INTEGER,
+        homes_count INTEGER DEFAULT 0,
+        knocked_count INTEGER DEFAULT 0,
+        leads_count INTEGER DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (assigned_to) REFERENCES salespeople(id)
+    );
+
+    -- Field leads from door-to-door
+    CREATE TABLE IF NOT EXISTS field_leads (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        salesperson_id INTEGER NOT NULL,
+        grid_cell_id INTEGER,
+        latitude REAL,
+        longitude REAL,
+        address TEXT,
+        customer_name TEXT,
+        first_name TEXT,
+        last_name TEXT,
+        phone TEXT,
+        email TEXT,
+        vehicle_info TEXT,
+        damage_description TEXT,
+        lead_quality TEXT DEFAULT 'WARM',
+        notes TEXT,
+        photo_urls TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        synced_to_crm INTEGER DEFAULT 0,
+        crm_lead_id INTEGER,
+        FOREIGN KEY (salesperson_id) REFERENCES salespeople(id),
+        FOREIGN KEY (grid_cell_id) REFERENCES sales_grid_cells(id)
+    );
+
+    -- Competitor activity tracking
+    CREATE TABLE IF NOT EXISTS competitor_activity (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        salesperson_id INTEGER,
+        competitor_name TEXT NOT NULL,
+        location_lat REAL NOT NULL,
+        location_lon REAL NOT NULL,
+        activity_type TEXT NOT NULL,
+        notes TEXT,
+        photo_url TEXT,
+        spotted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (salesperson_id) REFERENCES salespeople(id)
+    );
+
+    -- Do-not-knock list
+    CREATE TABLE IF NOT EXISTS do_not_knock_list (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        address TEXT,
+        latitude REAL NOT NULL,
+        longitude REAL NOT NULL,
+        reason TEXT NOT NULL,
+        notes TEXT,
+        added_by INTEGER,
+        added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        vx REAL,
+        vy REAL,
+        vz REAL,
+        FOREIGN KEY (added_by) REFERENCES salespeople(id)
+    );
+
+    -- Achievements/gamification
+    CREATE TABLE IF NOT EXISTS achievements (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        salesperson_id INTEGER NOT NULL,
+        achievement_type TEXT NOT NULL,
+        achievement_data TEXT,
+        achievement_date TEXT,
+        earned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (salesperson_id) REFERENCES salespeople(id)
+    );
+
+    -- Objection logging for analysis
+    CREATE TABLE IF NOT EXISTS objection_log (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        salesperson_id INTEGER NOT NULL,
+        objection_type TEXT NOT NULL,
+        response_used TEXT,
+        outcome TEXT,
+        logged_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (salesperson_id) REFERENCES salespeople(id)
+    );
+
+    -- Property enrichment lookups, so each address is fetched once
+    CREATE TABLE IF NOT EXISTS property_enrichment_cache (
+        address TEXT PRIMARY KEY,
+        data TEXT NOT NULL,
+        fetched_at TIMESTAMP NOT NULL
+    );
+
+    -- Create indexes
+    CREATE INDEX IF NOT EXISTS idx_field_leads_salesperson_created ON field_leads(salesperson_id, created_at, lead_quality);
+    CREATE INDEX IF NOT EXISTS idx_field_leads_quality ON field_leads(lead_quality);
+    CREATE INDEX IF NOT EXISTS idx_competitor_activity_spotted_name ON competitor_activity(spotted_at, competitor_name, location_lat, location_lon);
+    CREATE INDEX IF NOT EXISTS idx_dnk_location ON do_not_knock_list(latitude, longitude);
+    CREATE INDEX IF NOT EXISTS idx_dnk_added_at ON do_not_knock_list(added_at DESC);
+    CREATE INDEX IF NOT EXISTS idx_objection_log_type ON objection_log(objection_type);
+    CREATE INDEX IF NOT EXISTS idx_objection_log_logged ON objection_log(logged_at, objection_type, outcome, response_used);
+
+    -- Keep grid cell lead counts current as leads come in
+    CREATE TRIGGER IF NOT EXISTS trg_field_leads_grid_count
+    AFTER INSERT ON field_leads
+    WHEN NEW.grid_cell_id IS NOT NULL
+    BEGIN
+        UPDATE sales_grid_cells
+        SET leads_count = leads_count + 1,
+            updated_at = CURRENT_TIMESTAMP
+        WHERE id = NEW.grid_cell_id;
+    END;
+"""
+
+# Insert statements, shared by the single-row and bulk methods
+_SQL_INSERT_COMPETITOR_ACTIVITY = """
+    INSERT INTO competitor_activity (
+        salesperson_id, competitor_name,
+        location_lat, location_lon,
+        activity_type, notes, photo_url,
+        spotted_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_INSERT_ACHIEVEMENT = """
+    INSERT INTO achievements (
+        salesperson_id, achievement_type,
+        achievement_data, achievement_date, earned_at
+    ) VALUES (?, ?, ?, ?, ?)
+"""
+
+_SQL_INSERT_DO_NOT_KNOCK = """
+    INSERT INTO do_not_knock_list (
+        address, latitude, longitude,
+        reason, notes, added_by,
+        added_at, vx, vy, vz
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_INSERT_OBJECTION = """
+    INSERT INTO objection_log (
+        salesperson_id, objection_type,
+        response_used, outcome, logged_at
+    ) VALUES (?, ?, ?, ?, ?)
+"""
+
+_SQL_INSERT_FIELD_LEAD = """
+    INSERT INTO field_leads (
+        salesperson_id, grid_cell_id,
+        latitude, longitude, address,
+        customer_name, first_name, last_name,
+        phone, email,
+        vehicle_info, damage_description,
+        lead_quality, notes, photo_urls,
+        created_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    RETURNING id
+"""
+
+# Field lead columns for list views (no JSON blobs or free text);
+# get_lead_detail returns every column
+_LEAD_LIST_COLUMNS = """
+    id, salesperson_id, grid_cell_id, customer_name, address,
+    phone, email, lead_quality, created_at, synced_to_crm
+"""
+
+# Field lead reads/writes on the lead creation and CRM sync paths
+_SQL_LIST_LEADS = f"SELECT {_LEAD_LIST_COLUMNS} FROM field_leads WHERE salesperson_id = ?"
+
+# get_salesperson_leads query for each (date_from, date_to, quality) filter
+# combination, built once at import.
+# Dates are plain range predicates on the ISO created_at string, so the
+# (salesperson_id, created_at) index is used: [date_from, date_to + 1 day)
+_SQL_LIST_LEADS_BY_FILTERS = {
+    (has_from, has_to, has_quality): (
+        _SQL_LIST_LEADS
+        + (" AND created_at >= ?" if has_from else "")
+        + (" AND created_at < ?" if has_to else "")
+        + (" AND lead_quality = ?" if has_quality else "")
+        + " ORDER BY created_at DESC"
+    )
+    for has_from in (False, True)
+    for has_to in (False, True)
+    for has_quality in (False, True)
+}
+
+# Copy field leads into the main CRM leads table, entirely in SQLite.
+# Rows go in field lead id order and leads ids only grow, so the returned
+# ids line up with the matching field lead ids in ascending order.
+# Rows written without first_name/last_name (older code, scripts) fall
+# back to splitting customer_name at its first space.
+_SQL_SYNC_LEADS_TO_CRM = """
+    INSERT INTO leads (
+        first_name, last_name, phone, email,
+        source, temperature,
+        vehicle_year, vehicle_make, vehicle_model,
+        damage_type, damage_description, notes
+    )
+    SELECT
+        COALESCE(first_name, substr(name, 1, instr(name || ' ', ' ') - 1)),
+        COALESCE(last_name, ltrim(substr(name, instr(name || ' ', ' ')))),
+        phone, email,
+        'FIELD_SALES', lead_quality,
+        json_extract(vehicle_info, '$.year'),
+        json_extract(vehicle_info, '$.make'),
+        json_extract(vehicle_info, '$.model'),
+        'HAIL', damage_description, notes
+    FROM (
+        SELECT *, trim(COALESCE(customer_name, '')) AS name
+        FROM field_leads
+        WHERE id IN ({placeholders})
+    )
+    ORDER BY id
+    RETURNING id
+"""
+_SQL_SYNC_LEAD_TO_CRM = _SQL_SYNC_LEADS_TO_CRM.format(placeholders='?')
+_SQL_MARK_LEAD_SYNCED = """
+    UPDATE field_leads
+    SET synced_to_crm = 1, crm_lead_id = ?
+    WHERE id = ?
+"""
+
+# Everything _check_lead_achievements needs in one row: lifetime and
+# today's lead counts, and whether FIRST_LEAD / today's DAILY_TEN exist
+_SQL_LEAD_ACHIEVEMENT_STATUS = """
+    SELECT
+        (SELECT COUNT(*) FROM field_leads
+         WHERE salesperson_id = ?) AS total_leads,
+        (SELECT COUNT(*) FROM field_leads
+         WHERE salesperson_id = ?
+           AND created_at >= ? AND created_at < ?) AS daily_leads,
+        EXISTS(SELECT 1 FROM achievements
+               WHERE salesperson_id = ?
+                 AND achievement_type = 'FIRST_LEAD') AS has_first_lead,
+        EXISTS(SELECT 1 FROM achievements
+               WHERE salesperson_id = ?
+                 AND achievement_type = 'DAILY_TEN'
+                 AND achievement_date = ?) AS has_daily_ten
+"""
+
+# Placeholder result of _fetch_property_enrichment until a provider is wired in
+_STUB_PROPERTY_ENRICHMENT = {
+    'owner_name': 'John Smith',
+    'property_value': 425000,
+    'year_built': 2018,
+    'bedrooms': 4,
+    'bathrooms': 3,
+    'lot_size': 7500,
+    'vehicles_registered': [
+        {'year': 2022, 'make': 'Toyota', 'model': 'Camry'},
+        {'year': 2023, 'make': 'Honda', 'model': 'Pilot'}
+    ],
+    'estimated_income_bracket': '$100K-$150K',
+    'time_at_address': '5 years'
+}
+
+# (db_path, address) -> enrichment JSON, least recently used first
+_ENRICHMENT_MEMO: OrderedDict = OrderedDict()
+_ENRICHMENT_MEMO_LOCK = threading.Lock()
+
+
+def _parse_day(name: str, value: Optional[str]) -> Optional[date]:
+    """Parse the date part of a 'YYYY-MM-DD' or ISO timestamp filter"""
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value[:10])
+    except ValueError:
+        raise ValueError(f"Invalid {name}: {value!r} (expected YYYY-MM-DD)") from None
+
+
+def split_customer_name(customer_name: Optional[str]) -> Tuple[str, str]:
+    """First word and the rest of a customer name, as CRM first/last name"""
+    first, *rest = (customer_name or '').split() or ['']
+    return first, ' '.join(rest)
+
+
+def _unit_vector(latitude: float, longitude: float) -> Tuple[float, float, float]:
+    """Position on the unit sphere for a lat/lon in degrees"""
+    lat = math.radians(latitude)
+    lon = math.radians(longitude)
+    cos_lat = math.cos(lat)
+    return (cos_lat * math.cos(lon), cos_lat * math.sin(lon), math.sin(lat))
+
+
+def _cheap_ruler(latitude: float) -> Tuple[float, float]:
+    """
+    Feet per degree of longitude and of latitude near a latitude
+
+    FCC ellipsoidal flat-earth approximation (as used by cheap-ruler),
+    accurate to well under 0.1% over neighborhood distances.
+    """
+    cos1 = math.cos(math.radians(latitude))
+    cos2 = 2 * cos1 * cos1 - 1
+    cos3 = 2 * cos1 * cos2 - cos1
+    cos4 = 2 * cos1 * cos3 - cos2
+    cos5 = 2 * cos1 * cos4 - cos3
+    feet_per_km = 3280.8399
+    return (
+        (111.41513 * cos1 - 0.09455 * cos3 + 0.00012 * cos5) * feet_per_km,
+        (111.13209 - 0.56605 * cos2 + 0.0012 * cos4) * feet_per_km
+    )
+
+
+def _cluster_hotspots(
+    lats: np.ndarray,
+    lons: np.ndarray,
+    cell_degrees: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Bucket points into a lat/lon grid
+
+    Returns the centroid latitude, centroid longitude and point count
+    of every grid cell that holds at least one point.
+    """
+    cells = np.column_stack((
+        np.floor(lats / cell_degrees),
+        np.floor(lons / cell_degrees)
+    )).astype(np.int64)
+    _, cell_of_point, counts = np.unique(
+        cells, axis=0, return_inverse=True, return_counts=True
+    )
+    cell_of_point = cell_of_point.ravel()
+    return (
+        np.bincount(cell_of_point, weights=lats) / counts,
+        np.bincount(cell_of_point, weights=lons) / counts,
+        counts
+    )
+
+
+@lru_cache(maxsize=ROUTE_CACHE_SIZE)
+def _route_grid(
+    center_lat: float,
+    center_lon: float,
+    target_homes: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Stop coordinates and pairwise distance matrix (feet) for a route
+
+    Stops fan out up to 10 rows north and target_homes/10 columns east
+    of the cell center. Results are cached and returned read-only.
+    """
+    index = np.arange(target_homes)
+    coordinates = np.column_stack((
+        center_lat + (index % 10) * 0.0002,
+        center_lon + (index // 10) * 0.0002
+    ))
+
+    feet_per_lon, feet_per_lat = _cheap_ruler(center_lat)
+    points = coordinates * (feet_per_lat, feet_per_lon)
+    distances = np.hypot(
+        points[:, None, 0] - points[None, :, 0],
+        points[:, None, 1] - points[None, :, 1]
+    )
+
+    coordinates.flags.writeable = False
+    distances.flags.writeable = False
+    return coordinates, distances
+
+
+def _nearest_neighbor_tour(distances: np.ndarray) -> np.ndarray:
+    """Greedy open tour from stop 0, always walking to the closest unvisited stop"""
+    n = len(distances)
+    tour = np.zeros(n, dtype=np.intp)
+    visited = np.zeros(n, dtype=bool)
+    visited[0] = True
+    for position in range(1, n):
+        candidates = np.where(visited, np.inf, distances[tour[position - 1]])
+        tour[position] = np.argmin(candidates)
+        visited[tour[position]] = True
+    return tour
+
+
+def _two_opt(tour: np.ndarray, distances: np.ndarray) -> np.ndarray:
+    """
+    Improve an open tour with 2-opt segment reversals until none helps
+
+    The first stop stays fixed; the last stop is free to change.
+    """
+    n = len(tour)
+    # Sentinel stop n past the end of the tour, zero distance from everything
+    padded = np.zeros((n + 1, n + 1))
+    padded[:n, :n] = distances
+    tour = np.append(tour, n)
+
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, n - 1):
+            # Reverse tour[i:j + 1] for each j > i: edges (a, b) and (c, e)
+            # become (a, c) and (b, e)
+            a, b = tour[i - 1], tour[i]
+            c, e = tour[i + 1:n], tour[i + 2:n + 1]
+            delta = padded[a, c] + padded[b, e] - padded[a, b] - padded[c, e]
+            best = int(np.argmin(delta))
+            if delta[best] < -1e-9:
+                j = i + 1 + best
+                tour[i:j + 1] = tour[i:j + 1][::-1]
+                improved = True
+    return tour[:n]
+
+
+def _tour_length(tour: np.ndarray, distances: np.ndarray) -> float:
+    """Total length of an open tour"""
+    return float(distances[tour[:-1], tour[1:]].sum())
 
 
 class EliteSalesManager:
@@ -35,131 +545,88 @@ class EliteSalesManager:
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
 
-            # Salespeople table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS salespeople (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    first_name TEXT NOT NULL,
-                    last_name TEXT NOT NULL,
-                    email TEXT,
-                    phone TEXT,
-                    employee_id TEXT UNIQUE,
-                    status TEXT DEFAULT 'ACTIVE',
-                    hire_date DATE,
-                    commission_rate REAL DEFAULT 0.15,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            # Schema already at this version; nothing to create or migrate
+            cursor.execute(
+                "CREATE TABLE IF NOT EXISTS elite_sales_schema (version INTEGER NOT NULL)"
+            )
+            row = cursor.execute("SELECT MAX(version) FROM elite_sales_schema").fetchone()
+            if row[0] == _SCHEMA_VERSION:
+                return
+
+            # Same per-connection tuning as transaction(); the migrations
+            # below write every existing row of some tables
+            for pragma in TRANSACTION_PRAGMAS:
+                cursor.execute(pragma)
+
+            cursor.executescript(_SCHEMA_SQL)
+
+            # Single-column indexes from earlier releases, superseded by the
+            # covering and achievement_date indexes
+            for index in (
+                'idx_field_leads_salesperson',
+                'idx_competitor_activity_spotted',
+                'idx_achievements_salesperson',
+            ):
+                cursor.execute(f"DROP INDEX IF EXISTS {index}")
+
+            # Unit vectors (see _unit_vector) for lists created before they
+            # were stored
+            for column in ('vx', 'vy', 'vz'):
+                try:
+                    cursor.execute(f"ALTER TABLE do_not_knock_list ADD COLUMN {column} REAL")
+                except sqlite3.OperationalError:
+                    pass
+
+            # Customer name split once at creation instead of on every sync
+            for column in ('first_name', 'last_name'):
+                try:
+                    cursor.execute(f"ALTER TABLE field_leads ADD COLUMN {column} TEXT")
+                except sqlite3.OperationalError:
+                    pass
+
+            unsplit = cursor.execute(
+                "SELECT id, customer_name FROM field_leads WHERE first_name IS NULL"
+            ).fetchall()
+            if unsplit:
+                cursor.executemany(
+                    "UPDATE field_leads SET first_name = ?, last_name = ? WHERE id = ?",
+                    [(*split_customer_name(name), lead_id) for lead_id, name in unsplit]
                 )
-            """)
 
-            # Sales grid cells for territory management
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS sales_grid_cells (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    swath_id INTEGER,
-                    cell_index INTEGER,
-                    center_lat REAL NOT NULL,
-                    center_lon REAL NOT NULL,
-                    status TEXT DEFAULT 'UNASSIGNED',
-                    assigned_to INTEGER,
-                    homes_count INTEGER DEFAULT 0,
-                    knocked_count INTEGER DEFAULT 0,
-                    leads_count INTEGER DEFAULT 0,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (assigned_to) REFERENCES salespeople(id)
-                )
-            """)
+            # Day each achievement is for, so DAILY_TEN checks can seek on it;
+            # older rows take it from their JSON 'date' or from earned_at
+            try:
+                cursor.execute("ALTER TABLE achievements ADD COLUMN achievement_date TEXT")
+            except sqlite3.OperationalError:
+                pass
 
-            # Field leads from door-to-door
             cursor.execute("""
-                CREATE TABLE IF NOT EXISTS field_leads (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    salesperson_id INTEGER NOT NULL,
-                    grid_cell_id INTEGER,
-                    latitude REAL,
-                    longitude REAL,
-                    address TEXT,
-                    customer_name TEXT,
-                    phone TEXT,
-                    email TEXT,
-                    vehicle_info TEXT,
-                    damage_description TEXT,
-                    lead_quality TEXT DEFAULT 'WARM',
-                    notes TEXT,
-                    photo_urls TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    synced_to_crm INTEGER DEFAULT 0,
-                    crm_lead_id INTEGER,
-                    FOREIGN KEY (salesperson_id) REFERENCES salespeople(id),
-                    FOREIGN KEY (grid_cell_id) REFERENCES sales_grid_cells(id)
+                UPDATE achievements
+                SET achievement_date = COALESCE(
+                    CASE WHEN json_valid(achievement_data)
+                         THEN json_extract(achievement_data, '$.date') END,
+                    substr(earned_at, 1, 10)
                 )
+                WHERE achievement_date IS NULL
             """)
-
-            # Competitor activity tracking
             cursor.execute("""
-                CREATE TABLE IF NOT EXISTS competitor_activity (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    salesperson_id INTEGER,
-                    competitor_name TEXT NOT NULL,
-                    location_lat REAL NOT NULL,
-                    location_lon REAL NOT NULL,
-                    activity_type TEXT NOT NULL,
-                    notes TEXT,
-                    photo_url TEXT,
-                    spotted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (salesperson_id) REFERENCES salespeople(id)
-                )
+                CREATE INDEX IF NOT EXISTS idx_achievements_salesperson_type_date
+                ON achievements(salesperson_id, achievement_type, achievement_date)
             """)
 
-            # Do-not-knock list
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS do_not_knock_list (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    address TEXT,
-                    latitude REAL NOT NULL,
-                    longitude REAL NOT NULL,
-                    reason TEXT NOT NULL,
-                    notes TEXT,
-                    added_by INTEGER,
-                    added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (added_by) REFERENCES salespeople(id)
+            missing = cursor.execute(
+                "SELECT id, latitude, longitude FROM do_not_knock_list WHERE vx IS NULL"
+            ).fetchall()
+            if missing:
+                cursor.executemany(
+                    "UPDATE do_not_knock_list SET vx = ?, vy = ?, vz = ? WHERE id = ?",
+                    [(*_unit_vector(lat, lon), dnk_id) for dnk_id, lat, lon in missing]
                 )
-            """)
-
-            # Achievements/gamification
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS achievements (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    salesperson_id INTEGER NOT NULL,
-                    achievement_type TEXT NOT NULL,
-                    achievement_data TEXT,
-                    earned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (salesperson_id) REFERENCES salespeople(id)
-                )
-            """)
-
-            # Objection logging for analysis
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS objection_log (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    salesperson_id INTEGER NOT NULL,
-                    objection_type TEXT NOT NULL,
-                    response_used TEXT,
-                    outcome TEXT,
-                    logged_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (salesperson_id) REFERENCES salespeople(id)
-                )
-            """)
-
-            # Create indexes
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_field_leads_salesperson ON field_leads(salesperson_id)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_field_leads_quality ON field_leads(lead_quality)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_competitor_activity_spotted ON competitor_activity(spotted_at)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_dnk_location ON do_not_knock_list(latitude, longitude)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_achievements_salesperson ON achievements(salesperson_id)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_objection_log_type ON objection_log(objection_type)")
 
+            cursor.execute("DELETE FROM elite_sales_schema")
+            cursor.execute(
+                "INSERT INTO elite_sales_schema (version) VALUES (?)", (_SCHEMA_VERSION,)
+            )
             conn.commit()
 
     # ========================================================================
@@ -203,32 +670,37 @@ class EliteSalesManager:
         else:
             cell = cells[0]
 
-        stops = []
-        current_time = start_time
+        time_per_home = 5  # minutes average
 
-        # Generate optimal route
-        # In production: Use real routing API (Google Maps, MapBox, etc.)
-        for i in range(target_homes):
-            offset_lat = (i % 10) * 0.0002
-            offset_lon = (i // 10) * 0.0002
-
-            stop_lat = cell['center_lat'] + offset_lat
-            stop_lon = cell['center_lon'] + offset_lon
-
-            address = f"{100 + i} Main St, Dallas, TX 75201"
+        coordinates, distances = _route_grid(
+            cell['center_lat'], cell['center_lon'], target_homes
+        )
 
-            time_per_home = 5  # minutes average
-            current_time = current_time + timedelta(minutes=time_per_home)
+        # Check do-not-knock for the whole route at once
+        dnk_matches = self.check_do_not_knock_batch(coordinates)
 
-            # Check do-not-knock before adding
-            dnk = self.check_do_not_knock(stop_lat, stop_lon)
+        # Order stops: nearest neighbor from the cell center, then 2-opt
+        # In production: Use real routing API (Google Maps, MapBox, etc.)
+        naive_order = np.arange(target_homes)
+        tour = naive_order
+        if target_homes:
+            tour = _two_opt(_nearest_neighbor_tour(distances), distances)
+        tour_feet = _tour_length(tour, distances)
+        naive_feet = _tour_length(naive_order, distances)
 
+        stops = []
+        for position, i in enumerate(tour.tolist()):
+            address = f"{100 + i} Main St, Dallas, TX 75201"
+            stop_lat, stop_lon = coordinates[i].tolist()
+            dnk = dnk_matches[i]
             stops.append({
-                'stop_number': i + 1,
+                'stop_number': position + 1,
                 'address': address,
                 'latitude': stop_lat,
                 'longitude': stop_lon,
-                'estimated_time': current_time.strftime('%I:%M %p'),
+                'estimated_time': (
+                    start_time + timedelta(minutes=time_per_home * (position + 1))
+                ).strftime('%I:%M %p'),
                 'property_data': self._get_property_enrichment(address),
                 'do_not_knock': dnk is not None,
                 'dnk_reason': dnk['reason'] if dnk else None
@@ -246,9 +718,9 @@ class EliteSalesManager:
             'total_stops': len(stops),
             'estimated_drive_time': drive_time,
             'estimated_knock_time': total_time,
-            'total_distance_miles': len(stops) * 0.05,
+            'total_distance_miles': round(tour_feet / 5280, 2),
             'stops': stops,
-            'optimization_score': 95
+            'optimization_score': round(100 * (1 - tour_feet / naive_feet)) if naive_feet else 0
         }
 
         print(f"Route Generated")
@@ -264,24 +736,55 @@ class EliteSalesManager:
         """
         Get enriched property data
 
+        Lookups are kept in memory and in property_enrichment_cache, so
+        the provider is only asked about an address once every
+        ENRICHMENT_MAX_AGE_DAYS.
+        """
+
+        key = (self.db.db_path, address)
+        with _ENRICHMENT_MEMO_LOCK:
+            data = _ENRICHMENT_MEMO.get(key)
+            if data is not None:
+                _ENRICHMENT_MEMO.move_to_end(key)
+
+        if data is None:
+            now = datetime.now()
+            cutoff = (now - timedelta(days=ENRICHMENT_MAX_AGE_DAYS)).isoformat()
+            cached = self.db.execute("""
+                SELECT data FROM property_enrichment_cache
+                WHERE address = ? AND fetched_at >= ?
+            """, (address, cutoff))
+
+            if cached:
+                data = cached[0]['data']
+            else:
+                data = json.dumps(self._fetch_property_enrichment(address))
+                with self.db.transaction():
+                    self.db.execute("""
+                        INSERT OR REPLACE INTO property_enrichment_cache (
+                            address, data, fetched_at
+                        ) VALUES (?, ?, ?)
+                    """, (address, data, now.isoformat()))
+
+            with _ENRICHMENT_MEMO_LOCK:
+                _ENRICHMENT_MEMO[key] = data
+                while len(_ENRICHMENT_MEMO) > ENRICHMENT_CACHE_SIZE:
+                    _ENRICHMENT_MEMO.popitem(last=False)
+
+        # Decoded per call so every caller gets its own copy
+        return json.loads(data)
+
+    def _fetch_property_enrichment(self, address: str) -> Dict:
+        """
+        Look up property data from the provider
+
         In production: Integrate with property databases like
         CoreLogic, ATTOM, Zillow API, etc.
         """
 
-        return {
-            'owner_name': 'John Smith',
-            'property_value': 425000,
-            'year_built': 2018,
-            'bedrooms': 4,
-            'bathrooms': 3,
-            'lot_size': 7500,
-            'vehicles_registered': [
-                {'year': 2022, 'make': 'Toyota', 'model': 'Camry'},
-                {'year': 2023, 'make': 'Honda', 'model': 'Pilot'}
-            ],
-            'estimated_income_bracket': '$100K-$150K',
-            'time_at_address': '5 years'
-        }
+        # Stub data; returned as-is because _get_property_enrichment only
+        # serializes it and hands callers their own decoded copy
+        return _STUB_PROPERTY_ENRICHMENT
 
     # ========================================================================
     # COMPETITIVE INTELLIGENCE
@@ -313,23 +816,17 @@ class EliteSalesManager:
             Competitor activity log ID
         """
 
-        result = self.db.execute("""
-            INSERT INTO competitor_activity (
-                salesperson_id, competitor_name,
-                location_lat, location_lon,
-                activity_type, notes, photo_url,
-                spotted_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            salesperson_id,
-            competitor_name,
-            location_lat,
-            location_lon,
-            activity_type,
-            notes,
-            photo_url,
-            datetime.now().isoformat()
-        ))
+        with self.db.transaction():
+            result = self.db.execute(_SQL_INSERT_COMPETITOR_ACTIVITY, (
+                salesperson_id,
+                competitor_name,
+                location_lat,
+                location_lon,
+                activity_type,
+                notes,
+                photo_url,
+                datetime.now().isoformat()
+            ))
 
         activity_id = result[0]['id']
 
@@ -342,6 +839,42 @@ class EliteSalesManager:
 
         return activity_id
 
+    def log_competitor_activity_bulk(
+        self,
+        records: List[Tuple]
+    ) -> int:
+        """
+        Log many competitor sightings at once (e.g. a day's field sync)
+
+        Args:
+            records: Tuples of (salesperson_id, competitor_name,
+                location_lat, location_lon, activity_type, notes, photo_url)
+
+        Returns:
+            Number of sightings logged
+
+        The team is alerted once per competitor, at its first sighting
+        in the batch.
+        """
+
+        spotted_at = datetime.now().isoformat()
+
+        with self.db.transaction():
+            count = self.db.execute_many(
+                _SQL_INSERT_COMPETITOR_ACTIVITY,
+                [(*record, spotted_at) for record in records]
+            )
+
+            logger.info("Competitor activity logged sightings=%s", count)
+
+            first_sightings = {}
+            for record in records:
+                first_sightings.setdefault(record[1], (record[2], record[3]))
+            for competitor_name, (lat, lon) in first_sightings.items():
+                self._alert_team_of_competitor(competitor_name, lat, lon)
+
+        return count
+
     def _alert_team_of_competitor(
         self,
         competitor_name: str,
@@ -381,11 +914,39 @@ class EliteSalesManager:
             'period_days': days_back,
             'total_sightings': sum(c['sightings'] for c in activity),
             'competitors': activity,
-            'hotspots': []
+            'hotspots': self._get_competitor_hotspots(cutoff)
         }
 
         return heatmap
 
+    def _get_competitor_hotspots(self, cutoff: str) -> List[Dict]:
+        """Grid cells with at least HOTSPOT_MIN_SIGHTINGS sightings since cutoff"""
+
+        sightings = self.db.execute("""
+            SELECT location_lat, location_lon
+            FROM competitor_activity
+            WHERE spotted_at >= ?
+        """, (cutoff,))
+
+        if not sightings:
+            return []
+
+        lats, lons, counts = _cluster_hotspots(
+            np.array([s['location_lat'] for s in sightings], dtype=float),
+            np.array([s['location_lon'] for s in sightings], dtype=float),
+            HOTSPOT_CELL_DEGREES
+        )
+
+        hot = np.flatnonzero(counts >= HOTSPOT_MIN_SIGHTINGS)
+        hot = hot[np.argsort(-counts[hot], kind='stable')]
+
+        return [
+            {'latitude': lat, 'longitude': lon, 'sightings': count}
+            for lat, lon, count in zip(
+                lats[hot].tolist(), lons[hot].tolist(), counts[hot].tolist()
+            )
+        ]
+
     # ========================================================================
     # INSTANT ESTIMATES
     # ========================================================================
@@ -480,7 +1041,9 @@ class EliteSalesManager:
         self,
         salesperson_id: int,
         achievement_type: str,
-        achievement_data: Dict
+        achievement_data: Union[Dict, str],
+        achievement_date: Optional[str] = None,
+        earned_at: Optional[datetime] = None
     ) -> int:
         """
         Award achievement badge to salesperson
@@ -492,32 +1055,26 @@ class EliteSalesManager:
         - PERFECT_WEEK: Hit target every day this week
         - CLOSER: 90%+ conversion rate
         - SPEED_DEMON: 100+ doors in one day
+
+        achievement_data may be a dict or an already-encoded JSON string.
+        achievement_date ('YYYY-MM-DD') is the day the achievement is for,
+        defaulting to today; earned_at defaults to now.
         """
 
-        result = self.db.execute("""
-            INSERT INTO achievements (
-                salesperson_id, achievement_type,
-                achievement_data, earned_at
-            ) VALUES (?, ?, ?, ?)
-        """, (
-            salesperson_id,
-            achievement_type,
-            json.dumps(achievement_data),
-            datetime.now().isoformat()
-        ))
+        now = earned_at or datetime.now()
 
-        achievement_id = result[0]['id']
+        with self.db.transaction():
+            result = self.db.execute(_SQL_INSERT_ACHIEVEMENT, (
+                salesperson_id,
+                achievement_type,
+                _json_dumps(achievement_data),
+                achievement_date or now.date().isoformat(),
+                now.isoformat()
+            ))
 
-        badges = {
-            'FIRST_LEAD': {'emoji': 'Target', 'name': 'First Blood', 'points': 10},
-            'LEAD_STREAK_5': {'emoji': 'Fire', 'name': 'On Fire', 'points': 50},
-            'DAILY_TEN': {'emoji': '100', 'name': 'Perfect Ten', 'points': 100},
-            'PERFECT_WEEK': {'emoji': 'Crown', 'name': 'Weekly King', 'points': 250},
-            'CLOSER': {'emoji': 'Medal', 'name': 'The Closer', 'points': 500},
-            'SPEED_DEMON': {'emoji': 'Lightning', 'name': 'Speed Demon', 'points': 150}
-        }
+        achievement_id = result[0]['id']
 
-        badge = badges.get(achievement_type, {'emoji': 'Trophy', 'name': 'Achievement', 'points': 10})
+        badge = _BADGES.get(achievement_type, _DEFAULT_BADGE)
 
         print(f"[{badge['emoji']}] Achievement Unlocked!")
         print(f"   {badge['name']}")
@@ -535,21 +1092,9 @@ class EliteSalesManager:
 
     def get_salesperson_points(self, salesperson_id: int) -> int:
         """Calculate total points for a salesperson"""
-        badges = {
-            'FIRST_LEAD': 10,
-            'LEAD_STREAK_5': 50,
-            'DAILY_TEN': 100,
-            'PERFECT_WEEK': 250,
-            'CLOSER': 500,
-            'SPEED_DEMON': 150
-        }
-
-        achievements = self.get_salesperson_achievements(salesperson_id)
-        total = 0
-        for ach in achievements:
-            total += badges.get(ach['achievement_type'], 10)
+        result = self.db.execute(_SQL_SALESPERSON_POINTS, (salesperson_id,))
 
-        return total
+        return result[0]['points']
 
     def get_leaderboard_realtime(
         self,
@@ -561,12 +1106,11 @@ class EliteSalesManager:
         Updates every minute
         """
 
-        if period == 'TODAY':
-            start_date = date.today().isoformat()
-        elif period == 'THIS_WEEK':
-            start_date = (date.today() - timedelta(days=date.today().weekday())).isoformat()
+        today = date.today()
+        if period == 'THIS_WEEK':
+            start_date = (today - timedelta(days=today.weekday())).isoformat()
         else:
-            start_date = date.today().isoformat()
+            start_date = today.isoformat()
 
         leaderboard = self.db.execute("""
             SELECT
@@ -577,7 +1121,7 @@ class EliteSalesManager:
                 SUM(CASE WHEN fl.lead_quality = 'HOT' THEN 1 ELSE 0 END) as hot_leads
             FROM salespeople s
             LEFT JOIN field_leads fl ON fl.salesperson_id = s.id
-                AND DATE(fl.created_at) >= ?
+                AND fl.created_at >= ?
             WHERE s.status = 'ACTIVE'
             GROUP BY s.id, s.first_name, s.last_name
             ORDER BY leads_today DESC
@@ -585,7 +1129,7 @@ class EliteSalesManager:
 
         for i, entry in enumerate(leaderboard):
             entry['rank'] = i + 1
-            entry['badge'] = 'Gold' if i == 0 else 'Silver' if i == 1 else 'Bronze' if i == 2 else ''
+            entry['badge'] = _LEADERBOARD_BADGES[i] if i < len(_LEADERBOARD_BADGES) else ''
 
         return leaderboard
 
@@ -612,21 +1156,17 @@ class EliteSalesManager:
         - COMPETITOR: Already working with competitor
         """
 
-        result = self.db.execute("""
-            INSERT INTO do_not_knock_list (
-                address, latitude, longitude,
-                reason, notes, added_by,
-                added_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (
-            address,
-            latitude,
-            longitude,
-            reason,
-            notes,
-            salesperson_id,
-            datetime.now().isoformat()
-        ))
+        with self.db.transaction():
+            result = self.db.execute(_SQL_INSERT_DO_NOT_KNOCK, (
+                address,
+                latitude,
+                longitude,
+                reason,
+                notes,
+                salesperson_id,
+                datetime.now().isoformat(),
+                *_unit_vector(latitude, longitude)
+            ))
 
         dnk_id = result[0]['id']
 
@@ -636,6 +1176,33 @@ class EliteSalesManager:
 
         return dnk_id
 
+    def mark_do_not_knock_bulk(
+        self,
+        records: List[Tuple]
+    ) -> int:
+        """
+        Mark many addresses as do-not-knock at once (e.g. a list import)
+
+        Args:
+            records: Tuples of (address, latitude, longitude, reason,
+                notes, salesperson_id)
+
+        Returns:
+            Number of addresses added
+        """
+
+        added_at = datetime.now().isoformat()
+
+        with self.db.transaction():
+            count = self.db.execute_many(_SQL_INSERT_DO_NOT_KNOCK, [
+                (*record, added_at, *_unit_vector(record[1], record[2]))
+                for record in records
+            ])
+
+        logger.info("Do-not-knock addresses added count=%s", count)
+
+        return count
+
     def check_do_not_knock(
         self,
         latitude: float,
@@ -648,21 +1215,113 @@ class EliteSalesManager:
         Returns warning if within radius
         """
 
-        # Convert radius to approximate lat/lon degrees
-        # 1 degree lat ~ 364,000 feet, 1 degree lon varies by latitude
-        radius_degrees = radius_feet / 364000
+        lat_radius, lon_radius = self._dnk_search_radius(latitude, radius_feet)
+        x, y, z = _unit_vector(latitude, longitude)
 
+        # The lat/lon box narrows the search through idx_dnk_location;
+        # the dot product of unit vectors is >= cos(angle) for points
+        # within radius_feet along the earth's surface
         nearby = self.db.execute("""
             SELECT * FROM do_not_knock_list
-            WHERE ABS(latitude - ?) < ?
-              AND ABS(longitude - ?) < ?
-        """, (latitude, radius_degrees, longitude, radius_degrees))
+            WHERE latitude > ? AND latitude < ?
+              AND longitude > ? AND longitude < ?
+              AND vx * ? + vy * ? + vz * ? >= ?
+            LIMIT 1
+        """, (
+            latitude - lat_radius, latitude + lat_radius,
+            longitude - lon_radius, longitude + lon_radius,
+            x, y, z, math.cos(radius_feet / EARTH_RADIUS_FEET)
+        ))
 
         if nearby:
             return nearby[0]
 
         return None
 
+    def check_do_not_knock_batch(
+        self,
+        locations: Union[List[Tuple[float, float]], np.ndarray],
+        radius_feet: float = 50
+    ) -> List[Optional[Dict]]:
+        """
+        Check many (latitude, longitude) locations against the do-not-knock list
+
+        Same test as check_do_not_knock, but with one query for the area
+        around all locations and the proximity matrix computed with NumPy.
+
+        Returns:
+            The first matching entry, or None, for each location in order
+        """
+
+        if len(locations) == 0:
+            return []
+
+        points = np.asarray(locations, dtype=float)
+        lats = points[:, 0]
+        lons = points[:, 1]
+
+        # Degrees of longitude are shortest farthest from the equator
+        lat_radius, lon_radius = self._dnk_search_radius(
+            float(np.abs(lats).max()), radius_feet
+        )
+
+        entries = self._get_do_not_knock_in_box(
+            float(lats.min()) - lat_radius,
+            float(lats.max()) + lat_radius,
+            float(lons.min()) - lon_radius,
+            float(lons.max()) + lon_radius
+        )
+        if not entries:
+            return [None] * len(locations)
+
+        # Same vectors as _unit_vector, for every location at once
+        lat_rad = np.radians(lats)
+        lon_rad = np.radians(lons)
+        cos_lat = np.cos(lat_rad)
+        stop_vectors = np.column_stack((
+            cos_lat * np.cos(lon_rad),
+            cos_lat * np.sin(lon_rad),
+            np.sin(lat_rad)
+        ))
+        dnk_vectors = np.array(
+            [(entry['vx'], entry['vy'], entry['vz']) for entry in entries],
+            dtype=float
+        )
+
+        # (locations x entries) matrix of unit-vector dot products
+        hits = stop_vectors @ dnk_vectors.T >= math.cos(radius_feet / EARTH_RADIUS_FEET)
+        found = hits.any(axis=1)
+        first = hits.argmax(axis=1)
+
+        return [
+            entries[index] if hit else None
+            for hit, index in zip(found.tolist(), first.tolist())
+        ]
+
+    @staticmethod
+    def _dnk_search_radius(latitude: float, radius_feet: float = 50) -> Tuple[float, float]:
+        """Degrees of latitude and longitude that cover a do-not-knock radius"""
+        feet_per_lon, feet_per_lat = _cheap_ruler(latitude)
+        # 1% margin: the great-circle test uses a sphere, the ruler an ellipsoid
+        radius_feet *= 1.01
+        return radius_feet / feet_per_lat, radius_feet / max(feet_per_lon, 1e-6)
+
+    def _get_do_not_knock_in_box(
+        self,
+        min_lat: float,
+        max_lat: float,
+        min_lon: float,
+        max_lon: float
+    ) -> List[Dict]:
+        """Get do-not-knock entries inside a lat/lon box (uses idx_dnk_location)"""
+        return self.db.execute("""
+            SELECT id, latitude, longitude, reason, address, vx, vy, vz
+            FROM do_not_knock_list
+            WHERE latitude BETWEEN ? AND ?
+              AND longitude BETWEEN ? AND ?
+            ORDER BY id
+        """, (min_lat, max_lat, min_lon, max_lon))
+
     def get_do_not_knock_list(
         self,
         swath_id: Optional[int] = None,
@@ -780,18 +1439,14 @@ class EliteSalesManager:
             Objection log ID
         """
 
-        result = self.db.execute("""
-            INSERT INTO objection_log (
-                salesperson_id, objection_type,
-                response_used, outcome, logged_at
-            ) VALUES (?, ?, ?, ?, ?)
-        """, (
-            salesperson_id,
-            objection_type,
-            response_used,
-            outcome,
-            datetime.now().isoformat()
-        ))
+        with self.db.transaction():
+            result = self.db.execute(_SQL_INSERT_OBJECTION, (
+                salesperson_id,
+                objection_type,
+                response_used,
+                outcome,
+                datetime.now().isoformat()
+            ))
 
         objection_id = result[0]['id']
 
@@ -827,9 +1482,13 @@ class EliteSalesManager:
             ORDER BY total DESC
         """, (cutoff,))
 
-        # Calculate conversion rates
+        # Calculate conversion rates, and the overall totals in the same pass
+        total_objections = 0
+        total_converted = 0
         for item in by_type:
             item['conversion_rate'] = (item['converted'] / item['total'] * 100) if item['total'] > 0 else 0
+            total_objections += item['total']
+            total_converted += item['converted']
 
         # Get best responses per objection type
         best_responses = self.db.execute("""
@@ -849,8 +1508,8 @@ class EliteSalesManager:
             'period_days': days_back,
             'by_type': by_type,
             'best_responses': best_responses,
-            'total_objections': sum(t['total'] for t in by_type),
-            'overall_conversion_rate': sum(t['converted'] for t in by_type) / max(sum(t['total'] for t in by_type), 1) * 100
+            'total_objections': total_objections,
+            'overall_conversion_rate': total_converted / max(total_objections, 1) * 100
         }
 
     # ========================================================================
@@ -866,11 +1525,11 @@ class EliteSalesManager:
         customer_name: str,
         phone: Optional[str] = None,
         email: Optional[str] = None,
-        vehicle_info: Optional[Dict] = None,
+        vehicle_info: Optional[Union[Dict, str]] = None,
         damage_description: Optional[str] = None,
         lead_quality: str = 'WARM',
         notes: Optional[str] = None,
-        photo_urls: Optional[List[str]] = None,
+        photo_urls: Optional[Union[List[str], str]] = None,
         grid_cell_id: Optional[int] = None
     ) -> int:
         """
@@ -884,110 +1543,90 @@ class EliteSalesManager:
             customer_name: Customer name
             phone: Phone number
             email: Email address
-            vehicle_info: Vehicle details as dict
+            vehicle_info: Vehicle details as dict (or JSON string)
             damage_description: Description of damage
             lead_quality: HOT, WARM, COLD
             notes: Additional notes
-            photo_urls: List of photo URLs
+            photo_urls: List of photo URLs (or JSON string)
             grid_cell_id: Grid cell this lead is in
 
         Returns:
             New lead ID
         """
 
-        result = self.db.execute("""
-            INSERT INTO field_leads (
-                salesperson_id, grid_cell_id,
-                latitude, longitude, address,
-                customer_name, phone, email,
-                vehicle_info, damage_description,
-                lead_quality, notes, photo_urls,
-                created_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            salesperson_id,
-            grid_cell_id,
-            latitude,
-            longitude,
-            address,
-            customer_name,
-            phone,
-            email,
-            json.dumps(vehicle_info) if vehicle_info else None,
-            damage_description,
-            lead_quality,
-            notes,
-            json.dumps(photo_urls) if photo_urls else None,
-            datetime.now().isoformat()
-        ))
-
-        lead_id = result[0]['id']
-
-        # Update grid cell stats if applicable
-        if grid_cell_id:
-            self.db.execute("""
-                UPDATE sales_grid_cells
-                SET leads_count = leads_count + 1,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-            """, (grid_cell_id,))
-
-        print(f"Field Lead Created")
-        print(f"   Customer: {customer_name}")
-        print(f"   Quality: {lead_quality}")
-        print(f"   Address: {address}")
-
-        # Check for achievements
-        self._check_lead_achievements(salesperson_id)
+        # One clock read for the lead and its achievement checks
+        now = datetime.now()
+
+        # One write transaction for the lead, its grid count and any achievements
+        with self.db.transaction():
+            result = self.db.execute(_SQL_INSERT_FIELD_LEAD, (
+                salesperson_id,
+                grid_cell_id,
+                latitude,
+                longitude,
+                address,
+                customer_name,
+                *split_customer_name(customer_name),
+                phone,
+                email,
+                _json_dumps(vehicle_info) if vehicle_info else None,
+                damage_description,
+                lead_quality,
+                notes,
+                _json_dumps(photo_urls) if photo_urls else None,
+                now.isoformat()
+            ))
+
+            # trg_field_leads_grid_count bumps the grid cell's leads_count
+            lead_id = result[0]['id']
+
+            logger.debug("Field lead created id=%s customer=%s quality=%s address=%s",
+                         lead_id, customer_name, lead_quality, address)
+
+            # Check for achievements
+            self._check_lead_achievements(salesperson_id, now)
 
         return lead_id
 
-    def _check_lead_achievements(self, salesperson_id: int):
-        """Check and award any earned achievements"""
+    def _check_lead_achievements(
+        self,
+        salesperson_id: int,
+        now: Optional[datetime] = None
+    ):
+        """Check and award any earned achievements as of now (default: current time)"""
 
-        today = date.today().isoformat()
+        now = now or datetime.now()
+        today = now.date()
+        today_str = today.isoformat()
 
-        # Check for first lead
-        total_leads = self.db.execute("""
-            SELECT COUNT(*) as count FROM field_leads
-            WHERE salesperson_id = ?
-        """, (salesperson_id,))[0]['count']
-
-        if total_leads == 1:
-            # Check if already has this achievement
-            existing = self.db.execute("""
-                SELECT id FROM achievements
-                WHERE salesperson_id = ? AND achievement_type = 'FIRST_LEAD'
-            """, (salesperson_id,))
-
-            if not existing:
-                self.award_achievement(
-                    salesperson_id,
-                    'FIRST_LEAD',
-                    {'date': today}
-                )
+        # created_at is an ISO timestamp, so today is [today, tomorrow)
+        status = self.db.execute(_SQL_LEAD_ACHIEVEMENT_STATUS, (
+            salesperson_id,
+            salesperson_id, today_str, (today + timedelta(days=1)).isoformat(),
+            salesperson_id,
+            salesperson_id, today_str
+        ))[0]
 
-        # Check for daily 10
-        daily_leads = self.db.execute("""
-            SELECT COUNT(*) as count FROM field_leads
-            WHERE salesperson_id = ? AND DATE(created_at) = ?
-        """, (salesperson_id, today))[0]['count']
-
-        if daily_leads >= 10:
-            # Check if already has this for today
-            existing = self.db.execute("""
-                SELECT id FROM achievements
-                WHERE salesperson_id = ?
-                  AND achievement_type = 'DAILY_TEN'
-                  AND achievement_data LIKE ?
-            """, (salesperson_id, f'%{today}%'))
-
-            if not existing:
-                self.award_achievement(
-                    salesperson_id,
-                    'DAILY_TEN',
-                    {'date': today, 'leads': daily_leads}
-                )
+        # Check for first lead
+        if status['total_leads'] == 1 and not status['has_first_lead']:
+            self.award_achievement(
+                salesperson_id,
+                'FIRST_LEAD',
+                {'date': today_str},
+                achievement_date=today_str,
+                earned_at=now
+            )
+
+        # Check for daily 10 (once per day)
+        daily_leads = status['daily_leads']
+        if daily_leads >= 10 and not status['has_daily_ten']:
+            self.award_achievement(
+                salesperson_id,
+                'DAILY_TEN',
+                {'date': today_str, 'leads': daily_leads},
+                achievement_date=today_str,
+                earned_at=now
+            )
 
     def get_salesperson_leads(
         self,
@@ -997,25 +1636,45 @@ class EliteSalesManager:
         quality: Optional[str] = None
     ) -> List[Dict]:
         """Get leads for a salesperson with optional filters"""
+        return list(self.iter_salesperson_leads(
+            salesperson_id, date_from, date_to, quality
+        ))
 
-        query = "SELECT * FROM field_leads WHERE salesperson_id = ?"
-        params = [salesperson_id]
-
-        if date_from:
-            query += " AND DATE(created_at) >= ?"
-            params.append(date_from)
+    def iter_salesperson_leads(
+        self,
+        salesperson_id: int,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        quality: Optional[str] = None
+    ) -> Iterator[Dict]:
+        """
+        Yield a salesperson's leads one at a time, newest first
 
-        if date_to:
-            query += " AND DATE(created_at) <= ?"
-            params.append(date_to)
+        date_from and date_to are inclusive days ('YYYY-MM-DD'); ISO
+        timestamps are accepted and only their date part is used. Raises
+        ValueError if either is not a valid date.
+        """
 
-        if quality:
-            query += " AND lead_quality = ?"
-            params.append(quality)
+        day_start = _parse_day('date_from', date_from)
+        day_end = _parse_day('date_to', date_to)
+        if day_start is not None:
+            day_start = day_start.isoformat()
+        if day_end is not None:
+            day_end = (day_end + timedelta(days=1)).isoformat()
+        quality = quality or None
+
+        query = _SQL_LIST_LEADS_BY_FILTERS[
+            day_start is not None, day_end is not None, quality is not None
+        ]
+        params = (salesperson_id,) + tuple(
+            value for value in (day_start, day_end, quality) if value is not None
+        )
 
-        query += " ORDER BY created_at DESC"
+        return self.db.iter_rows(query, params)
 
-        return self.db.execute(query, tuple(params))
+    def get_lead_detail(self, lead_id: int) -> Optional[Dict]:
+        """Get every column of a field lead, including notes, photos and vehicle info"""
+        return self.db.get_by_id('field_leads', lead_id)
 
     def sync_lead_to_crm(self, field_lead_id: int) -> Optional[int]:
         """
@@ -1024,42 +1683,104 @@ class EliteSalesManager:
         Returns the CRM lead ID
         """
 
-        field_lead = self.db.execute(
-            "SELECT * FROM field_leads WHERE id = ?",
-            (field_lead_id,)
-        )
+        with self.db.transaction():
+            # Create lead in main CRM (no row if the field lead doesn't exist)
+            created = self.db.execute(_SQL_SYNC_LEAD_TO_CRM, (field_lead_id,))
 
-        if not field_lead:
-            return None
-
-        lead = field_lead[0]
-
-        # Parse vehicle info
-        vehicle_info = json.loads(lead['vehicle_info']) if lead['vehicle_info'] else {}
-
-        # Create lead in main CRM
-        crm_lead_id = self.db.insert('leads', {
-            'first_name': lead['customer_name'].split()[0] if lead['customer_name'] else '',
-            'last_name': ' '.join(lead['customer_name'].split()[1:]) if lead['customer_name'] and ' ' in lead['customer_name'] else '',
-            'phone': lead['phone'],
-            'email': lead['email'],
-            'source': 'FIELD_SALES',
-            'temperature': lead['lead_quality'],
-            'vehicle_year': vehicle_info.get('year'),
-            'vehicle_make': vehicle_info.get('make'),
-            'vehicle_model': vehicle_info.get('model'),
-            'damage_type': 'HAIL',
-            'damage_description': lead['damage_description'],
-            'notes': lead['notes']
-        })
+            if not created:
+                return None
 
-        # Update field lead with CRM link
-        self.db.execute("""
-            UPDATE field_leads
-            SET synced_to_crm = 1, crm_lead_id = ?
-            WHERE id = ?
-        """, (crm_lead_id, field_lead_id))
+            crm_lead_id = created[0]['id']
 
-        print(f"Lead synced to CRM: {crm_lead_id}")
+            # Update field lead with CRM link
+            self.db.execute(_SQL_MARK_LEAD_SYNCED, (crm_lead_id, field_lead_id))
+
+        logger.debug("Field lead synced to CRM field_lead_id=%s crm_lead_id=%s",
+                     field_lead_id, crm_lead_id)
 
         return crm_lead_id
+
+    def sync_leads_to_crm_batch(self, field_lead_ids: List[int]) -> Dict[int, int]:
+        """
+        Sync many field leads to the main CRM leads table in one transaction
+
+        Returns:
+            CRM lead ID by field lead ID; IDs that don't exist are left out
+        """
+
+        ids = sorted(set(field_lead_ids))
+        synced = {}
+
+        with self.db.transaction():
+            # Chunks stay under SQLite's bound-parameter limit
+            for start in range(0, len(ids), 500):
+                chunk = tuple(ids[start:start + 500])
+                placeholders = ', '.join('?' for _ in chunk)
+
+                found = self.db.execute(f"""
+                    SELECT id FROM field_leads
+                    WHERE id IN ({placeholders})
+                    ORDER BY id
+                """, chunk)
+                if not found:
+                    continue
+
+                created = self.db.execute(
+                    _SQL_SYNC_LEADS_TO_CRM.format(placeholders=placeholders), chunk
+                )
+                synced.update(zip(
+                    (row['id'] for row in found),
+                    sorted(row['id'] for row in created)
+                ))
+
+            self.db.execute_many(_SQL_MARK_LEAD_SYNCED, [
+                (crm_lead_id, field_lead_id)
+                for field_lead_id, crm_lead_id in synced.items()
+            ])
+
+        logger.debug("Field leads synced to CRM requested=%s synced=%s",
+                     len(ids), len(synced))
+
+        return synced
+
+    def reconcile_grid_cell_lead_counts(self) -> int:
+        """
+        Recount sales_grid_cells.leads_count from field_leads
+
+        leads_count is kept by trg_field_leads_grid_count; this repairs any
+        drift (deleted leads, leads moved between cells, rows written before
+        the trigger existed) with one grouped pass instead of a per-cell count.
+
+        Returns:
+            Number of grid cells whose count was corrected
+        """
+
+        with self.db.transaction():
+            # Cells with leads, from a single GROUP BY over field_leads
+            counted = self.db.execute("""
+                UPDATE sales_grid_cells
+                SET leads_count = counts.leads,
+                    updated_at = CURRENT_TIMESTAMP
+                FROM (
+                    SELECT grid_cell_id, COUNT(*) AS leads
+                    FROM field_leads
+                    WHERE grid_cell_id IS NOT NULL
+                    GROUP BY grid_cell_id
+                ) AS counts
+                WHERE sales_grid_cells.id = counts.grid_cell_id
+                  AND sales_grid_cells.leads_count IS NOT counts.leads
+            """)[0]['rowcount']
+
+            # Cells with no leads left
+            emptied = self.db.execute("""
+                UPDATE sales_grid_cells
+                SET leads_count = 0,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE leads_count IS NOT 0
+                  AND id NOT IN (
+                      SELECT grid_cell_id FROM field_leads
+                      WHERE grid_cell_id IS NOT NULL
+                  )
+            """)[0]['rowcount']
+
+        return counted + emptied
@@ -4,11 +4,31 @@ Handles connections and common operations for PDR CRM
 """
 
 import sqlite3
+import json
 import os
+import threading
 from datetime import datetime
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Iterator
 from contextlib import contextmanager
 
+try:
+    import orjson
+except ImportError:  # optional - faster JSON decoding when installed
+    orjson = None
+
+
+# Tuning for the connection a transaction() block opens. Connections from
+# get_connection() live for one statement, where per-connection PRAGMAs
+# cost more than they save.
+TRANSACTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",   # WAL makes NORMAL crash-safe; fsync per checkpoint
+    "PRAGMA temp_store=MEMORY",
+)
+
+# Columns aliased as "name [JSON]" are decoded by the sqlite3 module while
+# fetching, e.g. SELECT vehicle_info AS "vehicle_info [JSON]" -> row['vehicle_info']
+sqlite3.register_converter('JSON', orjson.loads if orjson else json.loads)
+
 
 class Database:
     """Database connection manager for PDR CRM"""
@@ -17,6 +37,9 @@ class Database:
         """Initialize database connection"""
         self.db_path = db_path
 
+        # Connection of the transaction() block open on each thread, if any
+        self._local = threading.local()
+
         # Ensure directory exists
         os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
 
@@ -25,30 +48,121 @@ class Database:
             from .schema import DatabaseSchema
             DatabaseSchema.create_all_tables(db_path)
 
+        # WAL lets readers run alongside a writer; the mode persists in the file
+        conn = sqlite3.connect(db_path)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a new configured connection"""
+        conn = sqlite3.connect(
+            self.db_path,
+            detect_types=sqlite3.PARSE_COLNAMES
+        )
+        conn.row_factory = sqlite3.Row  # Return rows as dictionaries
+        return conn
+
     @contextmanager
     def get_connection(self):
         """Get database connection as context manager"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Return rows as dictionaries
+        active = getattr(self._local, 'conn', None)
+        if active is not None:
+            # Inside transaction(): share its connection, it commits at the end
+            yield active
+            return
+
+        conn = self._connect()
         try:
             yield conn
             conn.commit()
         finally:
             conn.close()
 
+    @contextmanager
+    def transaction(self, immediate: bool = True):
+        """
+        Run every statement in the block as one transaction
+
+        Calls to execute()/execute_many() made inside the block on this
+        thread share one connection, so the whole block costs a single
+        BEGIN IMMEDIATE/COMMIT instead of one commit per statement.
+        Rolls back if the block raises. Nested blocks join the outer one.
+
+        Args:
+            immediate: Take the write lock up front. Pass False for
+                read-only blocks; they get one consistent snapshot
+                without blocking writers.
+        """
+        active = getattr(self._local, 'conn', None)
+        if active is not None:
+            yield active
+            return
+
+        conn = self._connect()
+        for pragma in TRANSACTION_PRAGMAS:
+            conn.execute(pragma)
+        conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        self._local.conn = conn
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._local.conn = None
+            conn.close()
+
     def execute(self, query: str, params: tuple = ()) -> List[Dict]:
         """Execute query and return results"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = None  # plain tuples; dicts are built below
             cursor.execute(query, params)
 
-            # For SELECT queries
-            if query.strip().upper().startswith('SELECT'):
-                return [dict(row) for row in cursor.fetchall()]
+            # For SELECT queries (including WITH ... SELECT) and
+            # INSERT/UPDATE/DELETE ... RETURNING
+            if (cursor.description is not None
+                    or query.strip().upper().startswith(('SELECT', 'WITH'))):
+                return self._rows_to_dicts(cursor)
 
             # For INSERT/UPDATE/DELETE
             return [{'id': cursor.lastrowid, 'rowcount': cursor.rowcount}]
 
+    def iter_rows(self, query: str, params: tuple = ()) -> Iterator[Dict]:
+        """
+        Yield SELECT results one dict at a time
+
+        Rows stream from the cursor instead of being collected into a list.
+        The connection stays open until the iterator is exhausted or closed.
+        Column names in the query must be unique.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(query, params)
+
+            columns = [col[0] for col in cursor.description]
+            for row in cursor:
+                yield dict(zip(columns, row))
+
+    @staticmethod
+    def _rows_to_dicts(cursor: sqlite3.Cursor) -> List[Dict]:
+        """Build result dicts from tuple rows, reading column names once"""
+        columns = [col[0] for col in cursor.description]
+        rows = cursor.fetchall()
+
+        if len(set(columns)) == len(columns):
+            return [dict(zip(columns, row)) for row in rows]
+
+        # Repeated names (e.g. SELECT a.*, b.*): first column wins, as with sqlite3.Row
+        first = {}
+        for index, name in enumerate(columns):
+            first.setdefault(name, index)
+        return [{name: row[index] for name, index in first.items()} for row in rows]
+
     def execute_many(self, query: str, params_list: List[tuple]) -> int:
         """Execute same query with multiple parameter sets"""
         with self.get_connection() as conn:
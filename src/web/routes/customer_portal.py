@@ -317,19 +317,15 @@ def view_flyer(flyer_token):
     flyer_manager = get_flyer_manager()
 
     flyer_url = f"https://flyers.pdrcrm.com/{flyer_token}"
-    flyer = flyer_manager.get_personalized_flyer(flyer_url)
-
-    if not flyer:
-        abort(404)
-
-    # Track the view
-    flyer_manager.track_flyer_view(
-        customer_id=flyer['customer_id'],
-        flyer_id=flyer['flyer_id'],
+    flyer = flyer_manager.fetch_and_track(
+        flyer_url,
         viewer_ip=request.remote_addr,
         user_agent=request.headers.get('User-Agent')
     )
 
+    if not flyer:
+        abort(404)
+
     return render_template('customer_portal/view_flyer.html',
         flyer=flyer
     )
@@ -529,12 +525,12 @@ def messages():
     manager = get_portal_manager()
 
     all_messages = manager.get_messages(customer_id)
-    unread = manager.get_messages(customer_id, unread_only=True)
+    unread_count = manager.count_unread_messages(customer_id)
 
     return render_template('customer_portal/messages.html',
         customer_name=session.get('portal_customer_name'),
         messages=all_messages,
-        unread_count=len(unread)
+        unread_count=unread_count
     )
 
 
@@ -774,7 +770,7 @@ def api_referral_stats():
     customer_id = session['portal_customer_id']
     manager = get_portal_manager()
 
-    dashboard = manager.get_referral_dashboard(customer_id)
+    dashboard = manager.get_referral_dashboard(customer_id, detailed=False)
 
     return jsonify({
         'summary': dashboard['summary'],
@@ -790,9 +786,9 @@ def api_unread_count():
     customer_id = session['portal_customer_id']
     manager = get_portal_manager()
 
-    unread = manager.get_messages(customer_id, unread_only=True)
+    unread_count = manager.count_unread_messages(customer_id)
 
-    return jsonify({'unread_count': len(unread)})
+    return jsonify({'unread_count': unread_count})
 
 
 # ============================================================================
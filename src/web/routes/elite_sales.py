@@ -27,7 +27,7 @@ from pathlib import Path
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
-from src.crm.managers.elite_sales_manager import EliteSalesManager
+from src.crm.managers.elite_sales_manager import EliteSalesManager, split_customer_name
 
 elite_sales_bp = Blueprint('elite_sales', __name__, url_prefix='/api/elite')
 
@@ -390,7 +390,7 @@ def create_field_lead():
 def get_field_lead(lead_id):
     """Get field lead details"""
 
-    lead = elite_mgr.db.get_by_id('field_leads', lead_id)
+    lead = elite_mgr.get_lead_detail(lead_id)
 
     if not lead:
         return jsonify({'error': 'Lead not found'}), 404
@@ -419,6 +419,11 @@ def update_field_lead(lead_id):
 
     update_data = {k: v for k, v in data.items() if k in allowed_fields}
 
+    if 'customer_name' in update_data:
+        update_data['first_name'], update_data['last_name'] = split_customer_name(
+            update_data['customer_name']
+        )
+
     if 'vehicle_info' in data:
         update_data['vehicle_info'] = json.dumps(data['vehicle_info'])
 
@@ -457,9 +462,19 @@ def bulk_sync_leads():
     if not data or 'lead_ids' not in data:
         return jsonify({'error': 'lead_ids required'}), 400
 
+    if not isinstance(data['lead_ids'], list):
+        return jsonify({'error': 'lead_ids must be a list'}), 400
+
+    try:
+        lead_ids = [int(lead_id) for lead_id in data['lead_ids']]
+    except (TypeError, ValueError):
+        return jsonify({'error': 'lead_ids must be integers'}), 400
+
+    synced = elite_mgr.sync_leads_to_crm_batch(lead_ids)
+
     results = []
-    for lead_id in data['lead_ids']:
-        crm_lead_id = elite_mgr.sync_lead_to_crm(lead_id)
+    for lead_id in lead_ids:
+        crm_lead_id = synced.get(lead_id)
         results.append({
             'field_lead_id': lead_id,
             'crm_lead_id': crm_lead_id,
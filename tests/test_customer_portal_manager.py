@@ -0,0 +1,109 @@
+"""
+Customer Portal Manager Tests
+=============================
+Tests for bulk portal access creation.
+"""
+
+import pytest
+import os
+
+# Add project root to path
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.crm.managers.customer_portal_manager import CustomerPortalManager
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+
+@pytest.fixture
+def manager(tmp_path):
+    """Customer portal manager on a fresh temporary database."""
+    return CustomerPortalManager(str(tmp_path / 'crm.db'))
+
+
+def create_customer(manager, first_name):
+    return manager.db.insert('customers', {
+        'first_name': first_name,
+        'last_name': 'Lee',
+        'email': f'{first_name.lower()}@example.com',
+        'phone': '555-0100'
+    })
+
+
+# =============================================================================
+# BULK ACCESS TESTS
+# =============================================================================
+
+class TestCreatePortalAccessBulk:
+    """Tests for CustomerPortalManager.create_portal_access_bulk()."""
+
+    def test_empty_batch(self, manager):
+        assert manager.create_portal_access_bulk([]) == []
+
+    def test_creates_and_refreshes_access(self, manager):
+        """New customers get access; existing access gets a fresh token."""
+        ann = create_customer(manager, 'Ann')
+        bob = create_customer(manager, 'Bob')
+        old_token = manager.create_portal_access(ann, 'ann@example.com')['access_token']
+
+        created = manager.create_portal_access_bulk([
+            (bob, 'bob@example.com', '555-0101'),
+            (ann, 'ann@new.example.com', None),
+        ])
+
+        assert [c['customer_id'] for c in created] == [bob, ann]
+        assert [c['email'] for c in created] == ['bob@example.com', 'ann@new.example.com']
+        assert len({c['access_token'] for c in created} | {old_token}) == 3
+
+        for credentials in created:
+            access = manager.validate_portal_token(credentials['access_token'])
+            assert access['customer_id'] == credentials['customer_id']
+            assert access['email'] == credentials['email']
+        assert manager.validate_portal_token(old_token) is None
+
+        rows = manager.db.execute(
+            "SELECT customer_id, COUNT(*) as n FROM customer_portal_access GROUP BY customer_id"
+        )
+        assert sorted((row['customer_id'], row['n']) for row in rows) == [(ann, 1), (bob, 1)]
+
+    def test_repeated_customer_gets_one_row(self, manager):
+        """A customer listed twice ends up with one row, from its last entry."""
+        ann = create_customer(manager, 'Ann')
+        bob = create_customer(manager, 'Bob')
+
+        created = manager.create_portal_access_bulk([
+            (ann, 'ann@example.com', None),
+            (bob, 'bob@example.com', None),
+            (ann, 'ann@new.example.com', '555-0102'),
+        ])
+
+        assert [c['customer_id'] for c in created] == [ann, bob]
+        assert created[0]['email'] == 'ann@new.example.com'
+
+        rows = manager.db.execute("""
+            SELECT access_token, email, phone FROM customer_portal_access
+            WHERE customer_id = ?
+        """, (ann,))
+        assert rows == [{
+            'access_token': created[0]['access_token'],
+            'email': 'ann@new.example.com',
+            'phone': '555-0102'
+        }]
+
+
+# =============================================================================
+# JOB STATUS TESTS
+# =============================================================================
+
+class TestJobStatusDetails:
+    """Tests for CustomerPortalManager._get_job_status_details()."""
+
+    def test_returns_independent_copies(self, manager):
+        """Changing one result doesn't leak into later calls."""
+        details = manager._get_job_status_details('IN_PROGRESS')
+        details['label'] = 'Changed'
+
+        assert manager._get_job_status_details('IN_PROGRESS')['label'] != 'Changed'
@@ -0,0 +1,93 @@
+"""
+Database Transaction Tests
+==========================
+Tests for Database.transaction(): commit, rollback on exception,
+nested blocks and per-thread connections.
+"""
+
+import pytest
+import os
+import threading
+
+# Add project root to path
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.crm.models.database import Database
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+
+@pytest.fixture
+def db(tmp_path):
+    """Database with the full CRM schema in a temporary directory."""
+    return Database(str(tmp_path / 'crm.db'))
+
+
+def count_locations(db):
+    return db.execute("SELECT COUNT(*) as n FROM locations")[0]['n']
+
+
+# =============================================================================
+# TRANSACTION TESTS
+# =============================================================================
+
+class TestTransaction:
+    """Tests for Database.transaction()."""
+
+    def test_commits_all_statements(self, db):
+        """Every statement in the block is committed together."""
+        with db.transaction():
+            db.insert('locations', {'name': 'North'})
+            db.insert('locations', {'name': 'South'})
+
+        assert count_locations(db) == 2
+
+    def test_rolls_back_on_exception(self, db):
+        """A block that raises leaves nothing behind and re-raises."""
+        with pytest.raises(RuntimeError):
+            with db.transaction():
+                db.insert('locations', {'name': 'North'})
+                raise RuntimeError('boom')
+
+        assert count_locations(db) == 0
+
+    def test_nested_block_joins_outer(self, db):
+        """An inner block's writes roll back with the outer block."""
+        with pytest.raises(RuntimeError):
+            with db.transaction():
+                with db.transaction():
+                    db.insert('locations', {'name': 'North'})
+                raise RuntimeError('boom')
+
+        assert count_locations(db) == 0
+
+    def test_connection_released_after_block(self, db):
+        """Statements after the block run on their own connections again."""
+        with pytest.raises(RuntimeError):
+            with db.transaction():
+                raise RuntimeError('boom')
+
+        db.insert('locations', {'name': 'North'})
+        assert count_locations(db) == 1
+
+    def test_not_shared_across_threads(self, db):
+        """Other threads don't join the block and don't see its writes until commit."""
+        seen = {}
+
+        def read(key):
+            seen[key] = count_locations(db)
+
+        with db.transaction():
+            db.insert('locations', {'name': 'North'})
+            reader = threading.Thread(target=read, args=('during',))
+            reader.start()
+            reader.join()
+
+        reader = threading.Thread(target=read, args=('after',))
+        reader.start()
+        reader.join()
+
+        assert seen == {'during': 0, 'after': 1}
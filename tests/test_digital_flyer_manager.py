@@ -0,0 +1,324 @@
+"""
+Digital Flyer Manager Tests
+===========================
+Tests for the flyer template cache, serving personalized flyer pages,
+keeping their stored copies current, the view rollups kept by
+track_flyer_view and the weighted A/B variant sampling.
+"""
+
+import pytest
+import os
+import random
+from collections import Counter
+from datetime import date
+
+# Add project root to path
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.crm.managers import digital_flyer_manager
+from src.crm.managers.digital_flyer_manager import DigitalFlyerManager, _TTLCache
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+
+@pytest.fixture
+def manager(tmp_path):
+    """Digital flyer manager on a fresh temporary database."""
+    return DigitalFlyerManager(str(tmp_path / 'crm.db'))
+
+
+@pytest.fixture
+def customer_id(manager):
+    return manager.db.insert('customers', {
+        'first_name': 'Ann',
+        'last_name': 'Lee',
+        'email': 'ann@example.com',
+        'phone': '555-0100'
+    })
+
+
+def count_views(manager):
+    return manager.db.execute("SELECT COUNT(*) as n FROM flyer_views")[0]['n']
+
+
+# =============================================================================
+# TEMPLATE CACHE TESTS
+# =============================================================================
+
+class FakeClock:
+    """Stand-in for time.monotonic that only moves when told to."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(digital_flyer_manager.time, 'monotonic', clock)
+    return clock
+
+
+class TestTTLCache:
+    """Tests for _TTLCache."""
+
+    def test_entries_expire(self, clock):
+        cache = _TTLCache(ttl=60)
+        cache.set(('flyer', 1), 'row')
+
+        clock.now += 59
+        assert cache.get(('flyer', 1)) == 'row'
+
+        clock.now += 2
+        assert cache.get(('flyer', 1)) is None
+
+    def test_least_recently_used_evicted(self, clock):
+        cache = _TTLCache(maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        assert (cache.get('a'), cache.get('b'), cache.get('c')) == (1, None, 3)
+
+    def test_discard_kind(self, clock):
+        cache = _TTLCache()
+        cache.set(('active', None), [])
+        cache.set(('active', 'STANDARD'), [])
+        cache.set(('flyer', 1), {})
+
+        cache.discard_kind('active')
+
+        assert cache.get(('active', None)) is None
+        assert cache.get(('active', 'STANDARD')) is None
+        assert cache.get(('flyer', 1)) == {}
+
+
+class TestFlyerReadCache:
+    """get_flyer / get_active_flyers serve cached reads until a write or expiry."""
+
+    def set_name_behind_cache(self, manager, flyer_id, name):
+        manager.db.execute(
+            "UPDATE digital_flyers SET flyer_name = ? WHERE id = ?", (name, flyer_id)
+        )
+
+    def test_cached_until_expiry(self, manager, clock):
+        flyer_id = manager.upload_company_flyer('Spring', '<p>Hi</p>')
+        assert manager.get_flyer(flyer_id)['flyer_name'] == 'Spring'
+
+        self.set_name_behind_cache(manager, flyer_id, 'Summer')
+        assert manager.get_flyer(flyer_id)['flyer_name'] == 'Spring'
+
+        clock.now += digital_flyer_manager.FLYER_CACHE_TTL + 1
+        assert manager.get_flyer(flyer_id)['flyer_name'] == 'Summer'
+
+    def test_writes_invalidate(self, manager, clock):
+        flyer_id = manager.upload_company_flyer('Spring', '<p>Hi</p>')
+        manager.get_flyer(flyer_id)
+        assert [f['id'] for f in manager.get_active_flyers()] == [flyer_id]
+
+        manager.update_flyer(flyer_id, status='PAUSED')
+
+        assert manager.get_flyer(flyer_id)['status'] == 'PAUSED'
+        assert manager.get_active_flyers() == []
+
+    def test_callers_get_copies(self, manager, clock):
+        flyer_id = manager.upload_company_flyer('Spring', '<p>Hi</p>')
+        manager.get_flyer(flyer_id)['flyer_name'] = 'Changed'
+        manager.get_active_flyers()[0]['flyer_name'] = 'Changed'
+
+        assert manager.get_flyer(flyer_id)['flyer_name'] == 'Spring'
+        assert manager.get_active_flyers()[0]['flyer_name'] == 'Spring'
+
+
+# =============================================================================
+# PAGE SERVING TESTS
+# =============================================================================
+
+class TestFetchAndTrack:
+    """Tests for DigitalFlyerManager.fetch_and_track()."""
+
+    def test_serves_page_and_records_view(self, manager, customer_id):
+        """The page comes back personalized and the view is tagged with it."""
+        flyer_id = manager.upload_company_flyer('Spring', '<p>Hi {CUSTOMER_NAME}</p>')
+        personalized = manager.generate_personalized_flyer(customer_id, flyer_id)
+
+        page = manager.fetch_and_track(personalized['flyer_url'], '10.0.0.1', 'ua')
+
+        assert page['flyer_html'] == '<p>Hi Ann</p>'
+        views = manager.db.execute("""
+            SELECT customer_id, flyer_id, personalized_flyer_id, viewer_ip, user_agent
+            FROM flyer_views
+        """)
+        assert views == [{
+            'customer_id': customer_id,
+            'flyer_id': flyer_id,
+            'personalized_flyer_id': page['id'],
+            'viewer_ip': '10.0.0.1',
+            'user_agent': 'ua'
+        }]
+
+    def test_updates_rollups(self, manager, customer_id):
+        """Views recorded while serving feed the same rollups as track_flyer_view."""
+        flyer_id = manager.upload_company_flyer('Spring', '<p>Hi</p>')
+        personalized = manager.generate_personalized_flyer(customer_id, flyer_id)
+
+        for _ in range(2):
+            manager.fetch_and_track(personalized['flyer_url'], '10.0.0.1')
+
+        assert manager.get_flyer_view_history(flyer_id) == [
+            {'view_date': date.today().isoformat(), 'views': 2}
+        ]
+
+    def test_unknown_url(self, manager):
+        """An unknown URL returns None and records nothing."""
+        assert manager.fetch_and_track('https://example.com/nope', '10.0.0.1') is None
+        assert count_views(manager) == 0
+
+
+# =============================================================================
+# PERSONALIZED COPY TESTS
+# =============================================================================
+
+class TestCustomerRename:
+    """Stored personalized copies follow customer name changes."""
+
+    def test_rename_rebuilds_copy(self, manager, customer_id):
+        """The next view after a rename shows the new name."""
+        flyer_id = manager.upload_company_flyer('Spring', '<p>Hi {CUSTOMER_FULL_NAME}</p>')
+        flyer_url = manager.generate_personalized_flyer(customer_id, flyer_id)['flyer_url']
+        assert manager.get_personalized_flyer(flyer_url)['flyer_html'] == '<p>Hi Ann Lee</p>'
+
+        manager.db.update('customers', customer_id, {'first_name': 'Bob'})
+
+        page = manager.get_personalized_flyer(flyer_url)
+        assert page['flyer_html'] == '<p>Hi Bob Lee</p>'
+        assert page['first_name'] == 'Bob'
+
+    def test_other_changes_keep_copy(self, manager, customer_id):
+        """Updates that leave the name alone keep the stored copy."""
+        flyer_id = manager.upload_company_flyer('Spring', '<p>Hi {CUSTOMER_NAME}</p>')
+        flyer_url = manager.generate_personalized_flyer(customer_id, flyer_id)['flyer_url']
+
+        manager.db.update('customers', customer_id, {'first_name': 'Ann', 'phone': '555-0199'})
+
+        cached = manager.db.execute(
+            "SELECT cached_html FROM personalized_flyers WHERE flyer_url = ?", (flyer_url,)
+        )
+        assert cached == [{'cached_html': '<p>Hi Ann</p>'}]
+
+
+# =============================================================================
+# VIEW ROLLUP TESTS
+# =============================================================================
+
+class TestViewRollups:
+    """Rollup tables stay in step with the views recorded."""
+
+    def test_daily_totals(self, manager, customer_id):
+        """flyer_view_daily counts each flyer's views per day."""
+        flyer_id = manager.upload_company_flyer('Spring', '<p>Hi</p>')
+        other_flyer_id = manager.upload_company_flyer('Plain', '<p>Hi</p>')
+
+        for viewer_ip in ['10.0.0.1', '10.0.0.2', '10.0.0.1']:
+            manager.track_flyer_view(customer_id, flyer_id, viewer_ip)
+        manager.track_flyer_view(customer_id, other_flyer_id, '10.0.0.3')
+
+        assert manager.get_flyer_view_history(flyer_id) == [
+            {'view_date': date.today().isoformat(), 'views': 3}
+        ]
+        assert manager.get_flyer_view_history(other_flyer_id) == [
+            {'view_date': date.today().isoformat(), 'views': 1}
+        ]
+
+    def test_campaign_totals(self, manager, customer_id):
+        """Campaign stats count views and distinct viewers of its flyers only."""
+        campaign_id = manager.create_campaign('Spring')
+        flyer_id = manager.upload_company_flyer('Spring', '<p>Hi</p>', campaign_id=campaign_id)
+        other_flyer_id = manager.upload_company_flyer('Plain', '<p>Hi</p>')
+
+        for viewer_ip in ['10.0.0.1', '10.0.0.2', '10.0.0.1']:
+            manager.track_flyer_view(customer_id, flyer_id, viewer_ip)
+        manager.track_flyer_view(customer_id, other_flyer_id, '10.0.0.3')
+
+        assert manager.get_campaign_analytics(campaign_id) == {
+            'campaign_id': campaign_id,
+            'flyers': 1,
+            'total_views': 3,
+            'unique_viewers': 2
+        }
+
+    def test_customer_totals(self, manager, customer_id):
+        """customer_flyer_stats sums a customer's views across flyers."""
+        other_customer_id = manager.db.insert('customers', {'first_name': 'Bob', 'last_name': 'Ray'})
+        flyer_id = manager.upload_company_flyer('Spring', '<p>Hi</p>')
+        other_flyer_id = manager.upload_company_flyer('Plain', '<p>Hi</p>')
+
+        manager.track_flyer_view(customer_id, flyer_id, '10.0.0.1')
+        manager.track_flyer_view(customer_id, other_flyer_id, '10.0.0.1')
+        manager.track_flyer_view(other_customer_id, flyer_id, '10.0.0.2')
+
+        totals = manager.db.execute(
+            "SELECT customer_id, total_views FROM customer_flyer_stats ORDER BY customer_id"
+        )
+        assert totals == [
+            {'customer_id': customer_id, 'total_views': 2},
+            {'customer_id': other_customer_id, 'total_views': 1},
+        ]
+
+    def test_rollups_seeded_from_existing_views(self, manager, customer_id):
+        """Missing rollup tables are rebuilt from flyer_views on startup."""
+        campaign_id = manager.create_campaign('Spring')
+        flyer_id = manager.upload_company_flyer('Spring', '<p>Hi</p>', campaign_id=campaign_id)
+        for viewer_ip in ['10.0.0.1', '10.0.0.1', '10.0.0.2']:
+            manager.track_flyer_view(customer_id, flyer_id, viewer_ip)
+        for table in ('flyer_view_daily', 'customer_flyer_stats',
+                      'flyer_campaign_stats', 'flyer_campaign_viewers'):
+            manager.db.execute(f"DROP TABLE {table}")
+
+        reopened = DigitalFlyerManager(manager.db.db_path)
+
+        assert [row['views'] for row in reopened.get_flyer_view_history(flyer_id)] == [3]
+        assert reopened.db.execute("SELECT total_views FROM customer_flyer_stats") == [
+            {'total_views': 3}
+        ]
+        analytics = reopened.get_campaign_analytics(campaign_id)
+        assert (analytics['total_views'], analytics['unique_viewers']) == (3, 2)
+
+
+# =============================================================================
+# A/B SAMPLING TESTS
+# =============================================================================
+
+class TestWeightedSampleWithoutReplacement:
+    """Tests for DigitalFlyerManager._weighted_sample_without_replacement()."""
+
+    sample = staticmethod(DigitalFlyerManager._weighted_sample_without_replacement)
+
+    def test_non_positive_k(self):
+        assert self.sample([{'id': 1, 'weight': 1}], 0) == []
+        assert self.sample([{'id': 1, 'weight': 1}], -1) == []
+
+    def test_draws_each_row_at_most_once(self):
+        """k up to and past the row count returns distinct rows."""
+        rows = [{'id': i, 'weight': i + 1} for i in range(5)]
+
+        for k in range(1, 8):
+            ids = [row['id'] for row in self.sample(rows, k)]
+            assert len(ids) == min(k, len(rows))
+            assert len(set(ids)) == len(ids)
+
+    def test_heavier_rows_drawn_first_more_often(self):
+        """First draws follow the weights."""
+        random.seed(1234)
+        rows = [{'id': 'heavy', 'weight': 90}, {'id': 'light', 'weight': 10}]
+
+        firsts = Counter(self.sample(rows, 1)[0]['id'] for _ in range(2000))
+
+        assert 0.85 < firsts['heavy'] / 2000 < 0.95
@@ -0,0 +1,347 @@
+"""
+Elite Sales Manager Tests
+=========================
+Tests for schema migration, batch CRM sync, grid cell lead count
+reconciliation, canvassing route ordering and do-not-knock proximity
+checks.
+"""
+
+import pytest
+import math
+import os
+import sqlite3
+
+import numpy as np
+
+# Add project root to path
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.crm.managers.elite_sales_manager import (
+    EARTH_RADIUS_FEET,
+    EliteSalesManager,
+    _SCHEMA_VERSION,
+    _nearest_neighbor_tour,
+    _route_grid,
+    _tour_length,
+    _two_opt,
+    _unit_vector,
+)
+from src.crm.models.database import Database
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+
+@pytest.fixture
+def manager(tmp_path):
+    """Elite sales manager on a fresh temporary database."""
+    return EliteSalesManager(str(tmp_path / 'crm.db'))
+
+
+def create_lead(manager, customer_name, grid_cell_id=None):
+    return manager.create_field_lead(
+        salesperson_id=1,
+        latitude=32.7767,
+        longitude=-96.7970,
+        address='100 Main St',
+        customer_name=customer_name,
+        grid_cell_id=grid_cell_id
+    )
+
+
+def create_grid_cell(manager, leads_count=0):
+    return manager.db.insert('sales_grid_cells', {
+        'center_lat': 32.7767,
+        'center_lon': -96.7970,
+        'leads_count': leads_count
+    })
+
+
+def leads_count(manager, cell_id):
+    return manager.db.get_by_id('sales_grid_cells', cell_id)['leads_count']
+
+
+# =============================================================================
+# SCHEMA MIGRATION TESTS
+# =============================================================================
+
+# Elite sales tables as created before first/last name, achievement_date
+# and do-not-knock unit vectors were stored
+PRE_SERIES_SCHEMA = """
+    CREATE TABLE field_leads (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        salesperson_id INTEGER NOT NULL,
+        grid_cell_id INTEGER,
+        latitude REAL,
+        longitude REAL,
+        address TEXT,
+        customer_name TEXT,
+        phone TEXT,
+        email TEXT,
+        vehicle_info TEXT,
+        damage_description TEXT,
+        lead_quality TEXT DEFAULT 'WARM',
+        notes TEXT,
+        photo_urls TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        synced_to_crm INTEGER DEFAULT 0,
+        crm_lead_id INTEGER
+    );
+    CREATE TABLE do_not_knock_list (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        address TEXT,
+        latitude REAL NOT NULL,
+        longitude REAL NOT NULL,
+        reason TEXT NOT NULL,
+        notes TEXT,
+        added_by INTEGER,
+        added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE achievements (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        salesperson_id INTEGER NOT NULL,
+        achievement_type TEXT NOT NULL,
+        achievement_data TEXT,
+        earned_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE INDEX idx_field_leads_salesperson ON field_leads(salesperson_id);
+    CREATE INDEX idx_achievements_salesperson ON achievements(salesperson_id);
+
+    INSERT INTO field_leads (salesperson_id, customer_name) VALUES (1, 'Ann Lee Smith');
+    INSERT INTO do_not_knock_list (latitude, longitude, reason) VALUES (32.7767, -96.797, 'REQUESTED');
+    INSERT INTO achievements (salesperson_id, achievement_type, achievement_data, earned_at)
+    VALUES (1, 'DAILY_TEN', '{"date": "2024-03-01"}', '2024-03-02T08:00:00'),
+           (1, 'FIRST_LEAD', NULL, '2024-03-05T09:30:00');
+"""
+
+
+@pytest.fixture
+def pre_series_db(tmp_path):
+    """Database whose elite sales tables predate the stored columns."""
+    db_path = str(tmp_path / 'crm.db')
+    Database(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.executescript(PRE_SERIES_SCHEMA)
+    conn.close()
+    return db_path
+
+
+class TestSchemaMigration:
+    """Tests for EliteSalesManager._ensure_tables_exist() on existing databases."""
+
+    def test_backfills_new_columns(self, pre_series_db):
+        """Existing rows get names, achievement dates and unit vectors."""
+        manager = EliteSalesManager(pre_series_db)
+
+        lead = manager.db.execute("SELECT first_name, last_name FROM field_leads")
+        assert lead == [{'first_name': 'Ann', 'last_name': 'Lee Smith'}]
+
+        dates = manager.db.execute(
+            "SELECT achievement_type, achievement_date FROM achievements ORDER BY id"
+        )
+        assert dates == [
+            {'achievement_type': 'DAILY_TEN', 'achievement_date': '2024-03-01'},
+            {'achievement_type': 'FIRST_LEAD', 'achievement_date': '2024-03-05'},
+        ]
+
+        dnk = manager.db.execute("SELECT vx, vy, vz FROM do_not_knock_list")[0]
+        assert (dnk['vx'], dnk['vy'], dnk['vz']) == pytest.approx(_unit_vector(32.7767, -96.797))
+
+    def test_replaces_superseded_indexes(self, pre_series_db):
+        """Single-column indexes from earlier releases give way to the covering ones."""
+        manager = EliteSalesManager(pre_series_db)
+
+        indexes = {row['name'] for row in manager.db.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'"
+        )}
+        assert 'idx_field_leads_salesperson' not in indexes
+        assert 'idx_achievements_salesperson' not in indexes
+        assert 'idx_field_leads_salesperson_created' in indexes
+        assert 'idx_achievements_salesperson_type_date' in indexes
+
+    def test_version_recorded_in_own_table(self, pre_series_db):
+        """The version lives in elite_sales_schema; PRAGMA user_version is left alone."""
+        manager = EliteSalesManager(pre_series_db)
+
+        assert manager.db.execute("SELECT version FROM elite_sales_schema") == [
+            {'version': _SCHEMA_VERSION}
+        ]
+        conn = sqlite3.connect(pre_series_db)
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == 0
+        conn.close()
+
+    def test_setup_runs_once_per_version(self, pre_series_db):
+        """A database already at the current version is not migrated again."""
+        manager = EliteSalesManager(pre_series_db)
+        manager.db.execute("UPDATE field_leads SET first_name = NULL")
+
+        EliteSalesManager(pre_series_db)
+
+        assert manager.db.execute("SELECT first_name FROM field_leads") == [
+            {'first_name': None}
+        ]
+
+
+# =============================================================================
+# CRM SYNC TESTS
+# =============================================================================
+
+class TestSyncLeadsToCrmBatch:
+    """Tests for EliteSalesManager.sync_leads_to_crm_batch()."""
+
+    def test_maps_each_field_lead_to_its_crm_lead(self, manager):
+        """Every field lead maps to the CRM lead created from it."""
+        names = ['Ann Lee', 'Bob Ray', 'Cy Young']
+        lead_ids = [create_lead(manager, name) for name in names]
+
+        synced = manager.sync_leads_to_crm_batch(list(reversed(lead_ids)))
+
+        assert sorted(synced) == lead_ids
+        for lead_id, name in zip(lead_ids, names):
+            crm_lead = manager.db.get_by_id('leads', synced[lead_id])
+            assert f"{crm_lead['first_name']} {crm_lead['last_name']}" == name
+
+            field_lead = manager.get_lead_detail(lead_id)
+            assert field_lead['synced_to_crm'] == 1
+            assert field_lead['crm_lead_id'] == synced[lead_id]
+
+    def test_skips_missing_and_duplicate_ids(self, manager):
+        """Unknown IDs are left out and repeated IDs sync once."""
+        lead_id = create_lead(manager, 'Ann Lee')
+
+        synced = manager.sync_leads_to_crm_batch([lead_id, 999, lead_id])
+
+        assert list(synced) == [lead_id]
+        assert manager.db.execute("SELECT COUNT(*) as n FROM leads")[0]['n'] == 1
+
+    def test_empty_batch(self, manager):
+        """An empty batch syncs nothing."""
+        assert manager.sync_leads_to_crm_batch([]) == {}
+
+    def test_splits_customer_name_when_names_missing(self, manager):
+        """Rows written without first/last name (e.g. by scripts) still sync names."""
+        lead_id = manager.db.execute("""
+            INSERT INTO field_leads (salesperson_id, customer_name)
+            VALUES (1, 'Ann Lee Smith')
+        """)[0]['id']
+
+        synced = manager.sync_leads_to_crm_batch([lead_id])
+
+        crm_lead = manager.db.get_by_id('leads', synced[lead_id])
+        assert (crm_lead['first_name'], crm_lead['last_name']) == ('Ann', 'Lee Smith')
+
+
+# =============================================================================
+# GRID CELL TESTS
+# =============================================================================
+
+class TestReconcileGridCellLeadCounts:
+    """Tests for EliteSalesManager.reconcile_grid_cell_lead_counts()."""
+
+    def test_new_leads_bump_count(self, manager):
+        """The trigger keeps leads_count current as leads come in."""
+        cell_id = create_grid_cell(manager)
+        create_lead(manager, 'Ann Lee', grid_cell_id=cell_id)
+        create_lead(manager, 'Bob Ray', grid_cell_id=cell_id)
+
+        assert leads_count(manager, cell_id) == 2
+        assert manager.reconcile_grid_cell_lead_counts() == 0
+
+    def test_repairs_drifted_counts(self, manager):
+        """Counts that drifted from field_leads are corrected."""
+        busy_cell = create_grid_cell(manager)
+        empty_cell = create_grid_cell(manager, leads_count=4)
+        create_lead(manager, 'Ann Lee', grid_cell_id=busy_cell)
+        create_lead(manager, 'Bob Ray', grid_cell_id=busy_cell)
+        manager.db.execute(
+            "UPDATE sales_grid_cells SET leads_count = 7 WHERE id = ?", (busy_cell,)
+        )
+
+        assert manager.reconcile_grid_cell_lead_counts() == 2
+        assert leads_count(manager, busy_cell) == 2
+        assert leads_count(manager, empty_cell) == 0
+        assert manager.reconcile_grid_cell_lead_counts() == 0
+
+
+# =============================================================================
+# ROUTE OPTIMIZATION TESTS
+# =============================================================================
+
+class TestRouteOrdering:
+    """Tests for the nearest neighbor + 2-opt stop ordering."""
+
+    @pytest.mark.parametrize('target_homes', [1, 2, 5, 10, 23, 50, 100])
+    def test_tour_never_longer_than_naive_order(self, target_homes):
+        """The optimized tour visits every stop once and never walks further."""
+        _, distances = _route_grid(32.7767, -96.7970, target_homes)
+        naive_order = np.arange(target_homes)
+
+        tour = _two_opt(_nearest_neighbor_tour(distances), distances)
+
+        assert tour[0] == 0
+        assert sorted(tour.tolist()) == naive_order.tolist()
+        assert _tour_length(tour, distances) <= _tour_length(naive_order, distances) + 1e-6
+
+    def test_two_opt_never_lengthens_tour(self):
+        """2-opt only applies reversals that shorten a shuffled tour."""
+        _, distances = _route_grid(32.7767, -96.7970, 40)
+        rng = np.random.default_rng(7)
+        start = np.concatenate(([0], rng.permutation(np.arange(1, 40))))
+
+        tour = _two_opt(start.copy(), distances)
+
+        assert _tour_length(tour, distances) <= _tour_length(start, distances)
+
+
+# =============================================================================
+# DO-NOT-KNOCK TESTS
+# =============================================================================
+
+DNK_LAT, DNK_LON = 32.7767, -96.7970
+
+
+def offset(feet, bearing_degrees):
+    """Point `feet` from the do-not-knock entry along a bearing (small-distance approximation)"""
+    angle = feet / EARTH_RADIUS_FEET
+    bearing = math.radians(bearing_degrees)
+    return (
+        DNK_LAT + math.degrees(angle * math.cos(bearing)),
+        DNK_LON + math.degrees(angle * math.sin(bearing) / math.cos(math.radians(DNK_LAT)))
+    )
+
+
+class TestDoNotKnockProximity:
+    """Tests for check_do_not_knock() and check_do_not_knock_batch()."""
+
+    @pytest.fixture
+    def entry_id(self, manager):
+        return manager.mark_do_not_knock('100 Main St', DNK_LAT, DNK_LON, 'REQUESTED')
+
+    @pytest.mark.parametrize('bearing', [0, 45, 90, 180, 270])
+    def test_inside_radius(self, manager, entry_id, bearing):
+        """Points just inside the radius match, in every direction."""
+        match = manager.check_do_not_knock(*offset(45, bearing), radius_feet=50)
+
+        assert match is not None
+        assert match['id'] == entry_id
+
+    @pytest.mark.parametrize('bearing', [0, 45, 90, 180, 270])
+    def test_outside_radius(self, manager, entry_id, bearing):
+        """Points just outside the radius don't match."""
+        assert manager.check_do_not_knock(*offset(55, bearing), radius_feet=50) is None
+
+    def test_batch_matches_single_checks(self, manager, entry_id):
+        """The batch check gives the same answer as one check per location."""
+        locations = [offset(feet, bearing) for feet in (0, 30, 49, 51, 200)
+                     for bearing in (0, 135, 300)]
+
+        batch = manager.check_do_not_knock_batch(locations, radius_feet=50)
+
+        assert sum(entry is not None for entry in batch) == 9
+        assert [entry and entry['id'] for entry in batch] == [
+            entry and entry['id']
+            for entry in (manager.check_do_not_knock(lat, lon, 50) for lat, lon in locations)
+        ]
+        assert manager.check_do_not_knock_batch([]) == []
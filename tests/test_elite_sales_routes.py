@@ -0,0 +1,103 @@
+"""
+Elite Sales Route Tests
+=======================
+Tests for /api/elite/leads/bulk-sync request handling.
+"""
+
+import pytest
+import os
+from unittest.mock import patch
+
+# Add project root to path
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.web.app import create_app
+from src.web.routes import elite_sales
+from src.crm.managers.elite_sales_manager import EliteSalesManager
+
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+
+@pytest.fixture
+def manager(tmp_path):
+    """Elite sales manager on a fresh temporary database."""
+    return EliteSalesManager(str(tmp_path / 'crm.db'))
+
+
+@pytest.fixture
+def client(tmp_path, manager):
+    """Test client whose elite sales routes use the temporary manager."""
+    app = create_app({
+        'TESTING': True,
+        'DATABASE_PATH': str(tmp_path / 'app.db'),
+        'SECRET_KEY': 'test-secret-key',
+        'WTF_CSRF_ENABLED': False,
+        'LOGIN_DISABLED': True,
+    })
+    with patch.object(elite_sales, 'elite_mgr', manager):
+        yield app.test_client()
+
+
+def create_lead(manager, customer_name):
+    return manager.create_field_lead(
+        salesperson_id=1,
+        latitude=32.7767,
+        longitude=-96.7970,
+        address='100 Main St',
+        customer_name=customer_name
+    )
+
+
+def crm_lead_count(manager):
+    return manager.db.execute("SELECT COUNT(*) as n FROM leads")[0]['n']
+
+
+# =============================================================================
+# BULK SYNC TESTS
+# =============================================================================
+
+class TestBulkSyncLeads:
+    """Tests for POST /api/elite/leads/bulk-sync."""
+
+    def test_string_ids(self, client, manager):
+        """IDs sent as strings are reported under their integer value."""
+        lead_id = create_lead(manager, 'Ann Lee')
+
+        response = client.post('/api/elite/leads/bulk-sync',
+            json={'lead_ids': [str(lead_id)]})
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['synced'] == 1
+        assert data['results'][0]['field_lead_id'] == lead_id
+        assert data['results'][0]['success'] is True
+
+    def test_mixed_ids(self, client, manager):
+        """A mix of integer and string IDs syncs each lead once."""
+        first = create_lead(manager, 'Ann Lee')
+        second = create_lead(manager, 'Bob Ray')
+
+        response = client.post('/api/elite/leads/bulk-sync',
+            json={'lead_ids': [first, str(second), 999]})
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert [r['success'] for r in data['results']] == [True, True, False]
+        assert data['synced'] == 2
+        assert data['failed'] == 1
+        assert crm_lead_count(manager) == 2
+
+    @pytest.mark.parametrize('lead_ids', [['abc'], [1, None], [{'id': 1}], '12'])
+    def test_bad_ids_rejected(self, client, manager, lead_ids):
+        """Non-integer IDs return 400 without syncing anything."""
+        create_lead(manager, 'Ann Lee')
+
+        response = client.post('/api/elite/leads/bulk-sync',
+            json={'lead_ids': lead_ids})
+
+        assert response.status_code == 400
+        assert 'error' in response.get_json()
+        assert crm_lead_count(manager) == 0